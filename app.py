@@ -1,12 +1,67 @@
+import time
+STARTUP_STARTED = time.perf_counter()
+
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog, simpledialog
 import sqlite3
 import datetime
-from tkcalendar import DateEntry
+import os
+import sys
 import threading
-import time
-import queue
 from tkinter import font as tkfont
+import recurrence
+import task_io
+import task_store
+from db_worker import DatabaseWorker
+from profiler import PROFILER, ProfiledCursor
+from task_cache import Task, TaskCache
+from reminder_scheduler import ReminderQueue, ReminderScheduler
+from maintenance import MaintenanceScheduler
+
+# lists with more tasks than this are shown as a virtual, paged window
+VIRTUAL_THRESHOLD = 5000
+# extra rows fetched above and below the visible page in virtual mode
+VIRTUAL_BUFFER = 50
+# delay after the last keystroke before a search runs, in milliseconds
+SEARCH_DELAY = 150
+# most matches shown for a search
+SEARCH_LIMIT = 200
+# matches above which a search lists the newest instead of ranking them all by bm25
+SEARCH_RANK_LIMIT = 2000
+# rows read from the database or inserted into the list per event-loop turn while reloading
+LOAD_CHUNK = 500
+# labels of the deadline filter choices, mapped to task_store.DEADLINE_FILTERS
+DATE_FILTER_LABELS = {
+    "All Tasks": None,
+    "Due Today": "today",
+    "Due This Week": "week",
+    "Overdue": "overdue",
+    "Overdue > 7 Days": "overdue_week",
+    "No Deadline": "none",
+}
+STATUS_FILTER_LABELS = {"Any Status": None, "Pending": "Pending", "In Progress": "In Progress",
+                        "Completed": "Completed"}
+REMINDER_FILTER_LABELS = {"Any Reminder": None, "Reminder On": 1, "Reminder Off": 0}
+# database column behind each sortable list heading
+SORT_COLUMNS = {"ID": "id", "Title": "title", "Deadline": "deadline_day", "Status": "status", "Reminder": "reminder"}
+# time from launch until the first page of tasks is on screen, in milliseconds
+STARTUP_BUDGET_MS = float(os.environ.get("TODO_STARTUP_BUDGET_MS", "200"))
+# how often the database is checked for writes made by other connections, in milliseconds
+CHANGE_POLL_MS = 250
+# changelog rows above which a full reload is cheaper than patching row by row
+CHANGE_RELOAD_THRESHOLD = 500
+# task columns followed by the row's list tag, the first parameter must be today's date
+TASK_SELECT = f"{task_store.TASK_COLUMNS}, {task_store.TAG_SQL}"
+# repeat choices in the task form and the recurrence frequency behind each
+REPEAT_LABELS = {"Never": None, "Daily": "daily", "Weekly": "weekly", "Monthly": "monthly"}
+REPEAT_ERROR = "Repeat every must be a whole number and ends must be a date (YYYY-MM-DD) or a number of times"
+# the same over tasks_with_archive, tagging archived rows as such
+ARCHIVE_SELECT = f"{task_store.TASK_COLUMNS}, CASE WHEN archived = 1 THEN 'archived' ELSE {task_store.TAG_SQL} END"
+# delay before the first archive pass after startup, and between passes, in milliseconds
+ARCHIVE_START_DELAY_MS = 10000
+ARCHIVE_INTERVAL_MS = 3600 * 1000
+# minutes a snoozed reminder waits before firing again
+SNOOZE_MINUTES = 10
 
 class TodoApp:
     # function for initializing the application
@@ -29,18 +84,26 @@ class TodoApp:
         
         self.init_database()
         
-        self.reminder_queue = queue.Queue()
+        self.reminder_queue = ReminderQueue()
+        self.reminder_window = None
+        self.reminder_dropped = 0
         
         self.create_widgets()
         
-        self.load_tasks()
+        self.reminder_scheduler = ReminderScheduler(self.on_reminder_due)
+        self.reminder_scheduler.start()
+        
+        self.maintenance_scheduler = MaintenanceScheduler(self.on_maintenance_report)
+        self.maintenance_scheduler.start()
         
-        self.stop_thread = False
-        self.reminder_thread = threading.Thread(target=self.reminder_checker)
-        self.reminder_thread.daemon = True
-        self.reminder_thread.start()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         self.process_reminder_queue()
+        self.process_db_results()
+        self.root.after(CHANGE_POLL_MS, self.poll_external_changes)
+        
+        self.startup_ms = None
+        self.root.after_idle(self.on_first_paint)
 
     # function for defining and setting the styles for the application 
     def configure_styles(self):
@@ -88,20 +151,15 @@ class TodoApp:
     # function for initializing the database
     def init_database(self):
         try:
-            self.conn = sqlite3.connect("to-do.db")
-            self.cursor = self.conn.cursor()
+            self.conn = task_store.connect(isolation_level=None)
+            self.cursor = ProfiledCursor(self.conn.cursor(), PROFILER)
             
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tasks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    deadline TEXT,
-                    status TEXT DEFAULT 'Pending',
-                    reminder INTEGER DEFAULT 0
-                )
-            ''')
-            self.conn.commit()
+            self.data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            self.change_seq = task_store.latest_change(self.conn)
+            self.pruned_seq = 0
+            
+            self.db_worker = DatabaseWorker()
+            self.db_worker.start()
         except sqlite3.Error as e:
             messagebox.showerror("Database Error", f"Error connecting to database: {e}")
     
@@ -111,6 +169,28 @@ class TodoApp:
         self.label_font = tkfont.Font(family="Segoe UI", size=10)
         self.button_font = tkfont.Font(family="Segoe UI", size=10, weight="bold")
         
+        self.menu_bar = tk.Menu(self.root)
+        file_menu = tk.Menu(self.menu_bar, tearoff=0)
+        file_menu.add_command(label="Import Tasks...", command=self.import_tasks)
+        file_menu.add_command(label="Export Tasks...", command=self.export_tasks)
+        self.menu_bar.add_cascade(label="File", menu=file_menu)
+        
+        self.profiling_var = tk.BooleanVar(value=PROFILER.enabled)
+        tools_menu = tk.Menu(self.menu_bar, tearoff=0)
+        tools_menu.add_checkbutton(label="Enable Profiling", variable=self.profiling_var,
+                                   command=self.toggle_profiling)
+        tools_menu.add_command(label="Performance Stats...", command=self.show_stats_window)
+        tools_menu.add_command(label="Save Stats as JSON...", command=self.save_stats)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Archive Completed Tasks Now",
+                               command=lambda: self.archive_completed_tasks(reschedule=False))
+        tools_menu.add_command(label="Run Database Maintenance Now", command=self.run_maintenance)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Start cProfile Capture", command=self.start_cprofile)
+        tools_menu.add_command(label="Stop cProfile Capture...", command=self.stop_cprofile)
+        self.menu_bar.add_cascade(label="Tools", menu=tools_menu)
+        self.root.config(menu=self.menu_bar)
+        
         main_frame = ttk.Frame(self.root, style="TFrame")
         main_frame.pack(fill="both", expand=True, padx=20, pady=20)
         
@@ -150,20 +230,10 @@ class TodoApp:
         tk.Label(date_frame, text="Deadline:", bg=self.dark_secondary, fg=self.text_color, 
                 font=self.label_font, width=10).pack(side="left", anchor="w")
         
-        calendar_frame = tk.Frame(date_frame, bg=self.dark_secondary)
-        calendar_frame.pack(side="left", fill="x", expand=True, padx=5)
-        
-        self.deadline_entry = DateEntry(calendar_frame, width=12, 
-                                      background=self.dark_accent,
-                                      foreground=self.text_color, 
-                                      borderwidth=0,
-                                      highlightthickness=1,
-                                      highlightbackground=self.dark_accent,
-                                      highlightcolor=self.accent_blue,
-                                      date_pattern='yyyy-mm-dd',
-                                      selectmode='day',
-                                      state="readonly")
-        self.deadline_entry.pack(side="left", fill="x")
+        self.calendar_frame = tk.Frame(date_frame, bg=self.dark_secondary)
+        self.calendar_frame.pack(side="left", fill="x", expand=True, padx=5)
+        
+        self.deadline_entry = None
         
         status_frame = tk.Frame(date_status_row, bg=self.dark_secondary)
         status_frame.pack(side="right", padx=10)
@@ -189,6 +259,35 @@ class TodoApp:
                                            activeforeground=self.text_color)
         self.reminder_check.pack(side="left", padx=(80, 0))
         
+        tk.Label(reminder_frame, text="at (HH:MM):", bg=self.dark_secondary, fg=self.text_color,
+                font=self.label_font).pack(side="left", padx=(10, 0))
+        
+        self.reminder_time_entry = tk.Entry(reminder_frame, width=6, bg=self.dark_accent, fg=self.text_color,
+                                           insertbackground=self.text_color, relief=tk.FLAT, bd=5)
+        self.reminder_time_entry.pack(side="left", padx=5)
+        
+        tk.Label(reminder_frame, text="Repeat:", bg=self.dark_secondary, fg=self.text_color,
+                font=self.label_font).pack(side="left", padx=(20, 0))
+        
+        self.repeat_var = tk.StringVar(value="Never")
+        self.repeat_combo = ttk.Combobox(reminder_frame, textvariable=self.repeat_var, width=8,
+                                        values=list(REPEAT_LABELS), state="readonly")
+        self.repeat_combo.pack(side="left", padx=5)
+        
+        tk.Label(reminder_frame, text="every", bg=self.dark_secondary, fg=self.text_color,
+                font=self.label_font).pack(side="left")
+        
+        self.repeat_every_entry = tk.Entry(reminder_frame, width=3, bg=self.dark_accent, fg=self.text_color,
+                                          insertbackground=self.text_color, relief=tk.FLAT, bd=5)
+        self.repeat_every_entry.pack(side="left", padx=5)
+        
+        tk.Label(reminder_frame, text="ends (date or times):", bg=self.dark_secondary, fg=self.text_color,
+                font=self.label_font).pack(side="left")
+        
+        self.repeat_end_entry = tk.Entry(reminder_frame, width=10, bg=self.dark_accent, fg=self.text_color,
+                                        insertbackground=self.text_color, relief=tk.FLAT, bd=5)
+        self.repeat_end_entry.pack(side="left", padx=5)
+        
         button_frame = tk.Frame(input_frame, bg=self.dark_secondary)
         button_frame.pack(fill="x", pady=(15, 5))
         
@@ -219,18 +318,69 @@ class TodoApp:
         list_frame = tk.Frame(main_frame, bg=self.dark_bg, bd=0, relief=tk.GROOVE)
         list_frame.pack(fill="both", expand=True, pady=10)
         
-        list_label = tk.Label(list_frame, text="Your Tasks", font=self.label_font, 
+        list_header = tk.Frame(list_frame, bg=self.dark_bg)
+        list_header.pack(fill="x", pady=(0, 5))
+        
+        list_label = tk.Label(list_header, text="Your Tasks", font=self.label_font, 
                              bg=self.dark_bg, fg=self.text_color)
-        list_label.pack(anchor="w", pady=(0, 5))
+        list_label.pack(side="left")
+        
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", self.on_search_changed)
+        search_entry = tk.Entry(list_header, textvariable=self.search_var, width=30, bg=self.dark_accent,
+                                fg=self.text_color, insertbackground=self.text_color, relief=tk.FLAT, bd=5)
+        search_entry.pack(side="right")
+        
+        tk.Label(list_header, text="Search:", font=self.label_font,
+                bg=self.dark_bg, fg=self.text_color).pack(side="right", padx=5)
+        
+        filter_bar = tk.Frame(list_frame, bg=self.dark_bg)
+        filter_bar.pack(fill="x", pady=(0, 5))
+        
+        tk.Label(filter_bar, text="Show:", font=self.label_font,
+                bg=self.dark_bg, fg=self.text_color).pack(side="left", padx=(0, 5))
+        
+        self.date_filter_var = tk.StringVar(value="All Tasks")
+        self.status_filter_var = tk.StringVar(value="Any Status")
+        self.reminder_filter_var = tk.StringVar(value="Any Reminder")
+        
+        for variable, labels, width in ((self.date_filter_var, DATE_FILTER_LABELS, 16),
+                                        (self.status_filter_var, STATUS_FILTER_LABELS, 12),
+                                        (self.reminder_filter_var, REMINDER_FILTER_LABELS, 13)):
+            filter_combo = ttk.Combobox(filter_bar, textvariable=variable, width=width,
+                                        values=list(labels), state="readonly")
+            filter_combo.pack(side="left", padx=(0, 10))
+            filter_combo.bind("<<ComboboxSelected>>", self.on_filter_changed)
+        
+        self.include_archived_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(filter_bar, text="Include archived", variable=self.include_archived_var,
+                       command=self.on_filter_changed,
+                       bg=self.dark_bg, fg=self.text_color,
+                       selectcolor=self.dark_accent,
+                       activebackground=self.dark_bg,
+                       activeforeground=self.text_color).pack(side="left")
+        
+        self.due_banner = tk.Frame(list_frame, bg="#3A3A1E")
+        self.due_banner_text = tk.StringVar()
+        tk.Label(self.due_banner, textvariable=self.due_banner_text, bg="#3A3A1E", fg="#FFFF00",
+                 anchor="w", justify="left").pack(side="left", fill="x", expand=True, padx=5, pady=3)
+        tk.Button(self.due_banner, text="✕", command=self.due_banner.pack_forget, bg="#3A3A1E", fg="#FFFF00",
+                  activebackground=self.dark_accent, activeforeground="white",
+                  relief=tk.FLAT, bd=0, padx=5).pack(side="right")
         
         tree_frame = tk.Frame(list_frame, bg=self.accent_blue, bd=1)
         tree_frame.pack(fill="both", expand=True)
+        self.tree_frame = tree_frame
         
         columns = ("ID", "Title", "Description", "Deadline", "Status", "Reminder")
-        self.task_tree = ttk.Treeview(tree_frame, columns=columns, show="headings", style="Treeview")
+        self.task_tree = ttk.Treeview(tree_frame, columns=columns, show="headings", style="Treeview",
+                                      selectmode="extended")
         
         for col in columns:
-            self.task_tree.heading(col, text=col)
+            if col in SORT_COLUMNS:
+                self.task_tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            else:
+                self.task_tree.heading(col, text=col)
             if col == "ID":
                 self.task_tree.column(col, width=40, anchor="center")
             elif col == "Title":
@@ -244,162 +394,910 @@ class TodoApp:
             elif col == "Reminder":
                 self.task_tree.column(col, width=80, anchor="center")
         
-        y_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.task_tree.yview)
+        self.y_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.task_tree.yview)
         x_scrollbar = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.task_tree.xview)
-        self.task_tree.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
+        self.task_tree.configure(yscrollcommand=self.y_scrollbar.set, xscrollcommand=x_scrollbar.set)
         
-        y_scrollbar.pack(side="right", fill="y")
+        self.y_scrollbar.pack(side="right", fill="y")
         x_scrollbar.pack(side="bottom", fill="x")
         self.task_tree.pack(side="left", fill="both", expand=True)
         
+        self.configure_tags()
+        
         self.task_tree.bind("<<TreeviewSelect>>", self.on_task_select)
         self.task_tree.bind("<Double-1>", self.on_task_double_click)
+        self.task_tree.bind("<MouseWheel>", self.on_virtual_wheel)
+        self.task_tree.bind("<Button-4>", self.on_virtual_wheel)
+        self.task_tree.bind("<Button-5>", self.on_virtual_wheel)
+        self.task_tree.bind("<Configure>", self.on_virtual_resize)
         
-        self.context_menu = tk.Menu(self.root, tearoff=0, bg=self.dark_secondary, fg=self.text_color,
-                                   activebackground=self.accent_blue, activeforeground='white')
-        self.context_menu.add_command(label="Mark as Completed", command=lambda: self.change_status("Completed"))
-        self.context_menu.add_command(label="Mark as In Progress", command=lambda: self.change_status("In Progress"))
-        self.context_menu.add_command(label="Mark as Pending", command=lambda: self.change_status("Pending"))
-        self.context_menu.add_separator()
-        self.context_menu.add_command(label="Toggle Reminder", command=self.toggle_reminder)
-        self.context_menu.add_separator()
-        self.context_menu.add_command(label="Edit Task", command=self.edit_selected_task)
-        self.context_menu.add_command(label="Delete Task", command=self.delete_task)
-        
+        self.context_menu = None
         self.task_tree.bind("<Button-3>", self.show_context_menu)
         
         self.status_text = tk.StringVar()
         self.status_text.set("Ready")
-        status_bar = tk.Label(self.root, textvariable=self.status_text, bd=1, relief=tk.SUNKEN, 
-                             bg=self.dark_secondary, fg=self.text_color, anchor=tk.W)
+        status_bar = tk.Frame(self.root, bd=1, relief=tk.SUNKEN, bg=self.dark_secondary)
         status_bar.pack(side=tk.BOTTOM, fill=tk.X)
         
+        self.dashboard_text = tk.StringVar()
+        tk.Label(status_bar, textvariable=self.dashboard_text, bg=self.dark_secondary, fg=self.text_color,
+                 anchor=tk.E).pack(side=tk.RIGHT, padx=(10, 5))
+        tk.Label(status_bar, textvariable=self.status_text, bg=self.dark_secondary, fg=self.text_color,
+                 anchor=tk.W).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        self.counts = {}
+        self.counts_rolling = False
+        
         self.selected_task_id = None
+        self.selection_ids = set()
+        self.restored_selection = set()
+        self.task_rules = {}
+        self.task_cache = TaskCache()
+        self.cache_ready = False
+        self.cache_loading = False
+        self.cache_pending = set()
+        self.cache_generation = 0
+        self.insert_generation = 0
+        self.task_items = {}
+        self.item_tasks = {}
+        
+        self.search_query = ""
+        self.search_after_id = None
+        
+        self.today = datetime.date.today().strftime("%Y-%m-%d")
+        self.schedule_date_rollover()
+        
+        self.date_filter = None
+        self.status_filter = None
+        self.reminder_filter = None
+        self.include_archived = False
+        self.sort_heading = "ID"
+        self.sort_column = "id"
+        self.sort_descending = False
+        self.view_table = "tasks"
+        self.view_select = TASK_SELECT
+        self.view_where = "1 = 1"
+        self.view_params = ()
+        
+        self.virtual_mode = False
+        self.total_tasks = 0
+        self.view_offset = 0
+        self.page_rows = 20
+        self.window_start = 0
+        self.window_rows = []
+    
+    # function for building the deadline picker the first time it is needed,
+    # keeping the tkcalendar import off the startup path
+    def ensure_deadline_entry(self):
+        if self.deadline_entry is None:
+            from tkcalendar import DateEntry
+            
+            self.deadline_entry = DateEntry(self.calendar_frame, width=12, 
+                                          background=self.dark_accent,
+                                          foreground=self.text_color, 
+                                          borderwidth=0,
+                                          highlightthickness=1,
+                                          highlightbackground=self.dark_accent,
+                                          highlightcolor=self.accent_blue,
+                                          date_pattern='yyyy-mm-dd',
+                                          selectmode='day',
+                                          state="readonly")
+            self.deadline_entry.pack(side="left", fill="x")
+        return self.deadline_entry
+    
+    # function for building the context menu the first time it is shown
+    def ensure_context_menu(self):
+        if self.context_menu is None:
+            self.context_menu = tk.Menu(self.root, tearoff=0, bg=self.dark_secondary, fg=self.text_color,
+                                       activebackground=self.accent_blue, activeforeground='white')
+            self.context_menu.add_command(label="Mark as Completed", command=lambda: self.change_status("Completed"))
+            self.context_menu.add_command(label="Mark as In Progress", command=lambda: self.change_status("In Progress"))
+            self.context_menu.add_command(label="Mark as Pending", command=lambda: self.change_status("Pending"))
+            self.context_menu.add_separator()
+            self.context_menu.add_command(label="Toggle Reminder", command=self.toggle_reminder)
+            self.context_menu.add_command(label="Change Deadline...", command=self.change_deadline)
+            self.context_menu.add_separator()
+            self.context_menu.add_command(label="Edit Task", command=self.edit_selected_task)
+            self.context_menu.add_command(label="Delete Task", command=self.delete_task)
+            self.context_menu.add_command(label="Restore from Archive", command=self.restore_tasks)
+        return self.context_menu
+    
+    # function for showing the first page of tasks as soon as the window is painted,
+    # while the task cache is filled in the background
+    def on_first_paint(self):
+        try:
+            self.today = datetime.date.today().strftime("%Y-%m-%d")
+            self.task_rules = recurrence.load_rules(self.conn)
+            self.refresh_dashboard()
+            self.set_view_filter()
+            self.total_tasks = self.counts["total"]
+            self.set_virtual_mode(True)
+            self.render_virtual_page()
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Error loading tasks: {e}")
+        
+        self.status_text.set("Loading tasks...")
+        self.root.update_idletasks()
+        
+        self.startup_ms = (time.perf_counter() - STARTUP_STARTED) * 1000
+        PROFILER.record("startup: first_page", self.startup_ms / 1000)
+        if self.startup_ms > STARTUP_BUDGET_MS:
+            print(f"Startup took {self.startup_ms:.0f} ms, over the {STARTUP_BUDGET_MS:.0f} ms budget",
+                  file=sys.stderr)
+        
+        threading.Thread(target=self.fill_cache_in_background, daemon=True).start()
+        self.root.after_idle(self.ensure_deadline_entry)
+        self.root.after(ARCHIVE_START_DELAY_MS, self.archive_completed_tasks)
+    
+    # function for filling a task cache on a background thread and handing it to the UI
+    def fill_cache_in_background(self):
+        try:
+            started = time.perf_counter()
+            conn = task_store.connect()
+            try:
+                cache = TaskCache()
+                cache.load(conn.execute(f"SELECT {task_store.TASK_COLUMNS} FROM tasks"))
+            finally:
+                conn.close()
+            PROFILER.record("startup: fill_cache", time.perf_counter() - started)
+            self.db_worker.post(self.on_cache_filled, cache)
+        except sqlite3.Error as e:
+            self.db_worker.post(lambda error: messagebox.showerror(
+                "Database Error", f"Error loading tasks: {error}"), e)
+    
+    # function for switching to the filled task cache, catching up on writes made meanwhile
+    def on_cache_filled(self, cache):
+        if self.cache_ready:
+            return
+        
+        self.swap_cache(cache)
+        self.load_tasks(reload_cache=False)
+    
+    # function for making a freshly filled cache current, re-reading the tasks written
+    # while it was being filled
+    def swap_cache(self, cache):
+        for task_id in self.cache_pending:
+            self.cursor.execute(f"SELECT {task_store.TASK_COLUMNS} FROM tasks WHERE id = ?", (task_id,))
+            row = self.cursor.fetchone()
+            if row is None:
+                cache.remove(task_id)
+            else:
+                cache.put(row)
+        
+        self.task_cache = cache
+        self.cache_ready = True
+        self.cache_loading = False
+        self.cache_pending = set()
+    
+    # function for building the list values for a task row that ends with its tag
+    def task_row(self, task):
+        task_list = list(task[:6])
+        task_list[5] = "Yes" if task[5] == 1 else "No"
+        if task[5] == 1 and task[6]:
+            task_list[5] = f"Yes {task[6]}"
+        if task[0] in self.task_rules:
+            task_list[3] = f"{task[3]} ↻"
+        
+        return task_list, task[7]
+    
+    # function for reading today's date as an epoch day, the parameter of TAG_SQL
+    def today_day(self):
+        return task_store.epoch_day(datetime.datetime.strptime(self.today, "%Y-%m-%d").date())
+    
+    # function for classifying cached tasks in one pass against a single "today"
+    def classified_rows(self, tasks):
+        today = self.today_day()
+        for task in tasks:
+            yield task.as_row() + (task_store.task_tag(task.status, task_store.deadline_day(task.deadline), today),)
+    
+    # function for configuring the colour of each list tag once
+    def configure_tags(self):
+        self.task_tree.tag_configure("completed", foreground=self.accent_green)
+        self.task_tree.tag_configure("inprogress", foreground="#FFA500")
+        self.task_tree.tag_configure("pending", foreground=self.text_color)
+        self.task_tree.tag_configure("duetoday", foreground="#FFFF00")
+        self.task_tree.tag_configure("overdue", foreground=self.accent_red)
+        self.task_tree.tag_configure("archived", foreground="#808080")
+    
+    # function for scheduling the list retag at the next midnight
+    def schedule_date_rollover(self):
+        now = datetime.datetime.now()
+        midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+        self.root.after(int((midnight - now).total_seconds() * 1000) + 1000, self.on_date_rollover)
+    
+    # function for retagging only the rows whose classification changes with the date
+    def on_date_rollover(self):
+        old_today, old_day = self.today, self.today_day()
+        self.today = datetime.date.today().strftime("%Y-%m-%d")
+        self.schedule_date_rollover()
+        
+        if self.today == old_today:
+            return
+        
+        try:
+            self.refresh_dashboard()
+        except sqlite3.Error as e:
+            self.status_text.set(f"Error counting tasks: {e}")
+        
+        if self.virtual_mode:
+            try:
+                self.set_view_filter()
+                self.total_tasks = self.count_view()
+                self.render_virtual_page(reload=True)
+            except sqlite3.Error as e:
+                messagebox.showerror("Database Error", f"Error loading tasks: {e}")
+            return
+        
+        today = self.today_day()
+        changed = []
+        for deadline, ids in self.task_cache.by_deadline.items():
+            day = task_store.deadline_day(deadline)
+            if day is not None and old_day <= day <= today:
+                changed.extend(map(self.task_cache.get, ids))
+        for row in self.classified_rows(changed):
+            item = self.task_items.get(row[0])
+            if item is not None:
+                self.task_tree.item(item, tags=(row[7],))
     
     # function for loading the tasks from the database
-    def load_tasks(self):
-        for item in self.task_tree.get_children():
-            self.task_tree.delete(item)
+    @PROFILER.timed("ui: load_tasks")
+    def load_tasks(self, reload_cache=True):
+        if reload_cache:
+            self.reload_cache()
+            return
+        
+        if self.search_query:
+            self.run_search()
+            return
+        
+        self.clear_task_items()
         
         try:
-            self.cursor.execute("SELECT id, title, description, deadline, status, reminder FROM tasks")
-            tasks = self.cursor.fetchall()
+            self.today = datetime.date.today().strftime("%Y-%m-%d")
+            self.refresh_dashboard()
+            self.set_view_filter()
+            self.total_tasks = self.count_view()
             
-            for task in tasks:
-                task_list = list(task)
-                task_list[5] = "Yes" if task[5] == 1 else "No"
-                
-                if task[4] == "Completed":
-                    tag = "completed"
-                elif task[4] == "In Progress":
-                    tag = "inprogress"
-                else:
-                    tag = "pending"
-                    
-                today = datetime.date.today().strftime("%Y-%m-%d")
-                if task[3] == today and task[4] != "Completed":
-                    tag = "duetoday"
-                elif task[3] < today and task[4] != "Completed":
-                    tag = "overdue"
-                
-                self.task_tree.insert("", "end", values=task_list, tags=(tag,))
+            if not self.is_default_view() or self.total_tasks > VIRTUAL_THRESHOLD:
+                self.set_virtual_mode(True)
+                self.view_offset = 0
+                self.window_start = 0
+                self.window_rows = []
+                self.render_virtual_page()
+            else:
+                self.set_virtual_mode(False)
+                self.insert_rows_chunk(self.insert_generation, list(self.task_cache.tasks.values()), 0)
             
-            self.task_tree.tag_configure("completed", foreground=self.accent_green)
-            self.task_tree.tag_configure("inprogress", foreground="#FFA500")
-            self.task_tree.tag_configure("pending", foreground=self.text_color)
-            self.task_tree.tag_configure("duetoday", foreground="#FFFF00")
-            self.task_tree.tag_configure("overdue", foreground=self.accent_red)
+            summary = self.status_summary()
+            if self.is_filtered():
+                summary += f", showing {self.total_tasks}"
+            self.status_text.set(summary)
             
-            self.status_text.set(f"Loaded {len(tasks)} tasks")
+            with PROFILER.measure("ui: load_tasks.check_due_tasks"):
+                self.check_due_tasks()
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Error loading tasks: {e}")
+    
+    # function for re-reading the task cache in chunks, one chunk per event-loop turn, while
+    # the list keeps working from the old cache; a newer reload cancels this one
+    def reload_cache(self):
+        self.cache_generation += 1
+        
+        try:
+            self.change_seq = task_store.latest_change(self.conn)
+            self.task_rules = recurrence.load_rules(self.conn)
+            self.refresh_dashboard()
+            cursor = self.conn.cursor()
+            cursor.execute(f"SELECT {task_store.TASK_COLUMNS} FROM tasks")
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Error loading tasks: {e}")
+            return
+        
+        self.cache_loading = True
+        self.cache_pending = set()
+        self.load_cache_chunk(self.cache_generation, cursor, TaskCache(), 0)
+    
+    # function for reading the next chunk of a cache reload into the new cache
+    def load_cache_chunk(self, generation, cursor, cache, loaded):
+        if generation != self.cache_generation:
+            cursor.close()
+            return
+        
+        try:
+            with PROFILER.measure("ui: load_tasks.fill_cache_chunk"):
+                rows = cursor.fetchmany(LOAD_CHUNK)
+                for row in rows:
+                    cache.put(row)
+        except sqlite3.Error as e:
+            cursor.close()
+            self.cache_loading = False
+            messagebox.showerror("Database Error", f"Error loading tasks: {e}")
+            return
+        
+        if rows:
+            loaded += len(rows)
+            self.status_text.set(f"Loading tasks... {loaded} of {self.counts.get('total', loaded)}")
+            self.root.after(1, self.load_cache_chunk, generation, cursor, cache, loaded)
+            return
+        
+        cursor.close()
+        self.swap_cache(cache)
+        self.load_tasks(reload_cache=False)
+    
+    # function for inserting the next chunk of cached tasks into the list, skipping tasks
+    # that were deleted or already patched in since the list was cleared
+    def insert_rows_chunk(self, generation, tasks, position):
+        if generation != self.insert_generation:
+            return
+        
+        chunk = [self.task_cache.get(task.id) for task in tasks[position:position + LOAD_CHUNK]
+                 if task.id not in self.task_items]
+        with PROFILER.measure("ui: load_tasks.insert_chunk"):
+            for row in self.classified_rows(task for task in chunk if task is not None):
+                self.insert_task_item(row)
+        
+        position += LOAD_CHUNK
+        if position < len(tasks):
+            self.status_text.set(f"Showing tasks... {position} of {len(tasks)}")
+            self.root.after(1, self.insert_rows_chunk, generation, tasks, position)
+        elif position > LOAD_CHUNK:
+            self.status_text.set(self.status_summary())
+    
+    # function for inserting a task row at the end of the list
+    def insert_task_item(self, task):
+        task_list, tag = self.task_row(task)
+        item = self.task_tree.insert("", "end", values=task_list, tags=(tag,))
+        self.task_items[task[0]] = item
+        self.item_tasks[item] = task[0]
+        return item
+    
+    # function for removing every row from the list
+    def clear_task_items(self):
+        self.insert_generation += 1
+        self.task_tree.delete(*self.task_tree.get_children())
+        self.task_items = {}
+        self.item_tasks = {}
+    
+    # function for describing the task counts for the status bar
+    def status_summary(self):
+        return f"Loaded {self.counts.get('total', len(self.task_cache))} tasks"
+    
+    # function for reading the trigger-maintained counters into the status bar dashboard,
+    # recounting the date buckets first if nobody has done so since the date changed
+    def refresh_dashboard(self):
+        self.counts = task_store.read_counts(self.conn)
+        
+        today = datetime.datetime.strptime(self.today, "%Y-%m-%d").date()
+        if self.counts["today"] != task_store.epoch_day(today) and not self.counts_rolling:
+            self.counts_rolling = True
             
-            self.check_due_tasks()
+            def on_rolled(result):
+                self.counts_rolling = False
+                self.refresh_dashboard()
+                self.check_due_tasks()
+            
+            def on_roll_failed(e):
+                self.counts_rolling = False
+                self.status_text.set(f"Error counting tasks: {e}")
+            
+            self.db_worker.submit(lambda cursor: task_store.roll_counts(cursor, today),
+                                  on_rolled, on_roll_failed)
+        
+        counts = self.counts
+        self.dashboard_text.set(f"{counts['pending']} pending · {counts['in_progress']} in progress · "
+                                f"{counts['completed']} completed · {counts['due_today']} due today · "
+                                f"{counts['overdue']} overdue · {counts['reminders']} reminders")
+    
+    # function for checking whether any list filter is active
+    def is_filtered(self):
+        return bool(self.date_filter or self.status_filter or self.reminder_filter is not None
+                    or self.include_archived)
+    
+    # function for checking whether the list shows every task in id order
+    def is_default_view(self):
+        return not self.is_filtered() and self.sort_column == "id" and not self.sort_descending
+    
+    # function for building the WHERE clause of the list from the filter bar
+    def set_view_filter(self):
+        today = datetime.datetime.strptime(self.today, "%Y-%m-%d").date()
+        where, params = task_store.deadline_filter(self.date_filter, today)
+        clauses, params = [where], list(params)
+        
+        if self.status_filter:
+            clauses.append("status = ?")
+            params.append(self.status_filter)
+        if self.reminder_filter is not None:
+            clauses.append("reminder = ?")
+            params.append(self.reminder_filter)
+        
+        self.view_table = "tasks_with_archive" if self.include_archived else "tasks"
+        self.view_select = ARCHIVE_SELECT if self.include_archived else TASK_SELECT
+        self.view_where = " AND ".join(clauses)
+        self.view_params = tuple(params)
+    
+    # function for counting the rows of the current list view
+    def count_view(self):
+        if not self.is_filtered() and self.cache_ready:
+            return len(self.task_cache)
+        
+        self.cursor.execute(f"SELECT COUNT(*) FROM {self.view_table} WHERE {self.view_where}", self.view_params)
+        return self.cursor.fetchone()[0]
+    
+    # function for applying a new choice from the filter bar
+    def on_filter_changed(self, event=None):
+        filters = (DATE_FILTER_LABELS[self.date_filter_var.get()],
+                   STATUS_FILTER_LABELS[self.status_filter_var.get()],
+                   REMINDER_FILTER_LABELS[self.reminder_filter_var.get()],
+                   self.include_archived_var.get())
+        if filters == (self.date_filter, self.status_filter, self.reminder_filter, self.include_archived):
+            return
+        
+        self.date_filter, self.status_filter, self.reminder_filter, self.include_archived = filters
+        self.load_tasks(reload_cache=False)
+    
+    # function for sorting the list by a heading, clicking it again reverses the order
+    def sort_by(self, heading):
+        if heading == self.sort_heading:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.task_tree.heading(self.sort_heading, text=self.sort_heading)
+            self.sort_heading = heading
+            self.sort_column = SORT_COLUMNS[heading]
+            self.sort_descending = False
+        
+        arrow = " ▼" if self.sort_descending else " ▲"
+        self.task_tree.heading(heading, text=heading + arrow)
+        self.load_tasks(reload_cache=False)
+    
+    # function for fetching rows of the current view in sort order, the last column is the sort key
+    def fetch_view_rows(self, condition, params, limit, descending=False, offset=0):
+        direction = "DESC" if descending else "ASC"
+        order = f"id {direction}"
+        if self.sort_column != "id":
+            order = f"{self.sort_column} {direction}, {order}"
+        
+        self.cursor.execute(
+            f"SELECT {self.view_select}, {self.sort_column} FROM {self.view_table} "
+            f"WHERE ({self.view_where}) AND {condition} "
+            f"ORDER BY {order} LIMIT ? OFFSET ?",
+            (self.today_day(), *self.view_params, *params, limit, offset)
+        )
+        return self.cursor.fetchall()
+    
+    # function for fetching the rows that follow a row in a direction of the sort order,
+    # keyed on (sort column, id) so each step is an index seek; NULL keys sort first
+    def fetch_view_after(self, row, limit, backwards=False, inclusive=False):
+        descending = self.sort_descending != backwards
+        op = ("<" if descending else ">") + ("=" if inclusive else "")
+        key, task_id = row[8], row[0]
+        column = self.sort_column
+        
+        if column == "id":
+            return self.fetch_view_rows(f"id {op} ?", (task_id,), limit, descending)
+        
+        if key is None:
+            rows = self.fetch_view_rows(f"{column} IS NULL AND id {op} ?", (task_id,), limit, descending)
+            if len(rows) < limit and not descending:
+                rows += self.fetch_view_rows(f"{column} IS NOT NULL", (), limit - len(rows), descending)
+        else:
+            rows = self.fetch_view_rows(f"({column}, id) {op} (?, ?)", (key, task_id), limit, descending)
+            if len(rows) < limit and descending:
+                rows += self.fetch_view_rows(f"{column} IS NULL", (), limit - len(rows), descending)
+        return rows
+    
+    # function for switching the list between showing every row and a virtual window
+    def set_virtual_mode(self, enabled):
+        if enabled == self.virtual_mode:
+            return
+        
+        self.virtual_mode = enabled
+        self.window_rows = []
+        
+        if enabled:
+            self.task_tree.configure(yscrollcommand="")
+            self.y_scrollbar.configure(command=self.on_virtual_scroll)
+        else:
+            self.task_tree.configure(yscrollcommand=self.y_scrollbar.set)
+            self.y_scrollbar.configure(command=self.task_tree.yview)
+    
+    # function for fetching the buffered window of rows starting at an offset,
+    # walking by sort key from the rows already in memory wherever possible
+    def fetch_virtual_window(self, start):
+        size = self.page_rows + 2 * VIRTUAL_BUFFER
+        rows = self.window_rows
+        end = self.window_start + len(rows)
+        
+        if rows and self.window_start <= start < end:
+            window = rows[start - self.window_start:]
+            if len(window) < size:
+                window = window + self.fetch_view_after(window[-1], size - len(window))
+        elif rows and start == end:
+            window = self.fetch_view_after(rows[-1], size)
+        elif rows and self.window_start - size <= start < self.window_start:
+            before = self.fetch_view_after(rows[0], self.window_start - start, backwards=True)
+            window = (before[::-1] + rows)[:size]
+        else:
+            window = self.fetch_view_rows("1 = 1", (), size, self.sort_descending, offset=start)
+        
+        self.window_start = start
+        self.window_rows = window
+    
+    # function for rendering the visible page of a virtual list
+    @PROFILER.timed("ui: render_virtual_page")
+    def render_virtual_page(self, reload=False):
+        if reload and self.window_rows:
+            self.window_rows = self.fetch_view_after(self.window_rows[0], self.page_rows + 2 * VIRTUAL_BUFFER,
+                                                     inclusive=True)
+        
+        self.view_offset = max(0, min(self.view_offset, self.total_tasks - self.page_rows))
+        page_end = min(self.view_offset + self.page_rows, self.total_tasks)
+        
+        if not (self.window_start <= self.view_offset and
+                page_end <= self.window_start + len(self.window_rows)):
+            self.fetch_virtual_window(max(0, self.view_offset - VIRTUAL_BUFFER))
+        
+        first = self.view_offset - self.window_start
+        page = self.window_rows[first:first + self.page_rows]
+        
+        self.clear_task_items()
+        for task in page:
+            self.insert_task_item(task)
+        
+        # the selection event queued here is skipped by on_task_select, so a redraw never reloads
+        # the form over unsaved edits
+        selected = [self.task_items[task_id] for task_id in self.selection_ids if task_id in self.task_items]
+        if selected:
+            self.restored_selection = set(selected)
+            self.task_tree.selection_set(selected)
+        
+        if self.total_tasks:
+            self.y_scrollbar.set(self.view_offset / self.total_tasks, page_end / self.total_tasks)
+        else:
+            self.y_scrollbar.set(0, 1)
+    
+    # function for moving the virtual list to a new offset
+    def scroll_virtual_to(self, offset):
+        offset = max(0, min(offset, self.total_tasks - self.page_rows))
+        if offset == self.view_offset and self.task_items:
+            return
+        
+        self.view_offset = offset
+        try:
+            self.render_virtual_page()
         except sqlite3.Error as e:
             messagebox.showerror("Database Error", f"Error loading tasks: {e}")
     
+    # function for handling the scrollbar while the list is virtual
+    def on_virtual_scroll(self, *args):
+        if args[0] == "moveto":
+            self.scroll_virtual_to(int(float(args[1]) * self.total_tasks))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self.page_rows if args[2] == "pages" else 1)
+            self.scroll_virtual_to(self.view_offset + step)
+    
+    # function for handling the mouse wheel while the list is virtual
+    def on_virtual_wheel(self, event):
+        if not self.virtual_mode:
+            return None
+        
+        if event.num == 4 or event.delta > 0:
+            self.scroll_virtual_to(self.view_offset - 3)
+        else:
+            self.scroll_virtual_to(self.view_offset + 3)
+        return "break"
+    
+    # function for resizing the visible page when the list changes size
+    def on_virtual_resize(self, event):
+        rows = max(1, (event.height - 25) // 25)
+        if rows == self.page_rows:
+            return
+        
+        self.page_rows = rows
+        if self.virtual_mode:
+            try:
+                self.render_virtual_page()
+            except sqlite3.Error as e:
+                messagebox.showerror("Database Error", f"Error loading tasks: {e}")
+    
+    # function for patching a single task row in the list from the task cache,
+    # only falling back to a full reload when the list is out of sync
+    @PROFILER.timed("ui: refresh_task")
+    def refresh_task(self, task_id):
+        task_id = int(task_id)
+        if not self.cache_ready or self.cache_loading:
+            self.cache_pending.add(task_id)
+        self.total_tasks = len(self.task_cache)
+        
+        if self.virtual_mode:
+            try:
+                self.total_tasks = self.count_view()
+                self.render_virtual_page(reload=True)
+            except sqlite3.Error as e:
+                messagebox.showerror("Database Error", f"Error loading tasks: {e}")
+            return
+        
+        task = self.task_cache.get(task_id)
+        if task is None:
+            self.remove_task_item(task_id)
+            return
+        
+        row = next(self.classified_rows([task]))
+        task_list, tag = self.task_row(row)
+        item = self.task_items.get(task_id)
+        
+        try:
+            if item is None:
+                if not self.search_query:
+                    self.insert_task_item(row)
+                return
+            
+            current = self.task_tree.item(item)
+            if [str(v) for v in current["values"]] != [str(v) for v in task_list]:
+                self.task_tree.item(item, values=task_list, tags=(tag,))
+            elif tuple(current["tags"]) != (tag,):
+                self.task_tree.item(item, tags=(tag,))
+        except tk.TclError:
+            self.load_tasks(reload_cache=False)
+    
+    # function for patching several task rows in the list from the task cache
+    def refresh_tasks(self, task_ids):
+        task_ids = [int(task_id) for task_id in task_ids]
+        if not self.cache_ready or self.cache_loading:
+            self.cache_pending.update(task_ids)
+        
+        if self.virtual_mode:
+            try:
+                self.total_tasks = self.count_view()
+                self.render_virtual_page(reload=True)
+            except sqlite3.Error as e:
+                messagebox.showerror("Database Error", f"Error loading tasks: {e}")
+            return
+        
+        for task_id in task_ids:
+            self.refresh_task(task_id)
+    
+    # function for removing a single task row from the list
+    def remove_task_item(self, task_id):
+        if not self.cache_ready or self.cache_loading:
+            self.cache_pending.add(int(task_id))
+        
+        item = self.task_items.pop(int(task_id), None)
+        self.item_tasks.pop(item, None)
+        self.total_tasks = len(self.task_cache)
+        
+        if self.virtual_mode:
+            try:
+                self.total_tasks = self.count_view()
+                self.render_virtual_page(reload=True)
+            except sqlite3.Error as e:
+                messagebox.showerror("Database Error", f"Error loading tasks: {e}")
+            return
+        
+        if item is None:
+            return
+        
+        try:
+            self.task_tree.delete(item)
+        except tk.TclError:
+            self.load_tasks(reload_cache=False)
+    
+    # function for scheduling a search once typing pauses
+    def on_search_changed(self, *args):
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(SEARCH_DELAY, self.apply_search)
+    
+    # function for applying the text in the search box to the list
+    def apply_search(self):
+        self.search_after_id = None
+        query = task_store.fts_query(self.search_var.get())
+        if query == self.search_query:
+            return
+        
+        self.search_query = query
+        if query:
+            self.run_search()
+        else:
+            self.load_tasks(reload_cache=False)
+    
+    # function for showing the best full-text matches for the current search; bm25 scores
+    # every match, so past SEARCH_RANK_LIMIT matches the newest are shown unranked instead
+    @PROFILER.timed("ui: run_search")
+    def run_search(self):
+        try:
+            self.cursor.execute(
+                "SELECT COUNT(*) FROM (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ? LIMIT ?)",
+                (self.search_query, SEARCH_RANK_LIMIT + 1)
+            )
+            ranked = self.cursor.fetchone()[0] <= SEARCH_RANK_LIMIT
+            order = "bm25(tasks_fts)" if ranked else "tasks_fts.rowid DESC"
+            
+            self.cursor.execute(
+                f"SELECT {', '.join('t.' + c for c in task_store.TASK_FIELDS)}, {task_store.TAG_SQL} "
+                "FROM tasks_fts JOIN tasks t ON t.id = tasks_fts.rowid "
+                f"WHERE tasks_fts MATCH ? ORDER BY {order} LIMIT ?",
+                (self.today_day(), self.search_query, SEARCH_LIMIT)
+            )
+            tasks = self.cursor.fetchall()
+        except sqlite3.Error as e:
+            self.status_text.set(f"Search error: {e}")
+            return
+        
+        self.set_virtual_mode(False)
+        self.clear_task_items()
+        
+        for task in tasks:
+            self.insert_task_item(task)
+        
+        if ranked:
+            self.status_text.set(f"{len(tasks)} matching tasks")
+        else:
+            self.status_text.set(f"Over {SEARCH_RANK_LIMIT} matches, showing the newest {len(tasks)}; "
+                                 "type more to rank by relevance")
+    
     # function for adding a task to the database
+    @PROFILER.timed("ui: add_task")
     def add_task(self):
         title = self.title_entry.get().strip()
         description = self.desc_entry.get().strip()
-        deadline = self.deadline_entry.get()
+        deadline = self.ensure_deadline_entry().get()
         status = self.status_var.get()
         reminder = 1 if self.reminder_var.get() else 0
+        reminder_time = self.get_reminder_time()
         
         if not title:
             messagebox.showwarning("Input Error", "Title cannot be empty")
             return
         
-        try:
-            self.cursor.execute(
-                "INSERT INTO tasks (title, description, deadline, status, reminder) VALUES (?, ?, ?, ?, ?)",
-                (title, description, deadline, status, reminder)
+        if reminder_time is False:
+            messagebox.showwarning("Input Error", "Reminder time must be HH:MM")
+            return
+        
+        rule = self.get_rule(deadline)
+        if rule is False:
+            messagebox.showwarning("Input Error", REPEAT_ERROR)
+            return
+        
+        def insert(cursor):
+            cursor.execute(
+                "INSERT INTO tasks (title, description, deadline, status, reminder, reminder_time) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (title, description, deadline, status, reminder, reminder_time)
             )
-            self.conn.commit()
-            
+            task_id = cursor.lastrowid
+            if rule:
+                recurrence.save_rule(cursor, task_id, rule)
+            return task_id
+        
+        def on_added(task_id):
+            if rule:
+                self.task_rules[task_id] = rule
+            self.task_cache.put((task_id, title, description, deadline, status, reminder, reminder_time))
+            self.refresh_task(task_id)
+            self.reminder_scheduler.notify(task_id)
             self.clear_entries()
-            self.load_tasks()
-            
             self.status_text.set("Task added successfully")
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Error adding task: {e}")
+        
+        self.db_worker.submit(insert, on_added, self.db_error("Error adding task"))
 
     # function for updating a task in the database  
+    @PROFILER.timed("ui: update_task")
     def update_task(self):
         if not self.selected_task_id:
             return
         
         title = self.title_entry.get().strip()
         description = self.desc_entry.get().strip()
-        deadline = self.deadline_entry.get()
+        deadline = self.ensure_deadline_entry().get()
         status = self.status_var.get()
         reminder = 1 if self.reminder_var.get() else 0
+        reminder_time = self.get_reminder_time()
         
         if not title:
             messagebox.showwarning("Input Error", "Title cannot be empty")
             return
         
-        try:
-            self.cursor.execute(
-                "UPDATE tasks SET title = ?, description = ?, deadline = ?, status = ?, reminder = ? WHERE id = ?",
-                (title, description, deadline, status, reminder, self.selected_task_id)
+        if reminder_time is False:
+            messagebox.showwarning("Input Error", "Reminder time must be HH:MM")
+            return
+        
+        task_id = self.selected_task_id
+        
+        rule = self.get_rule(deadline, self.task_rules.get(task_id))
+        if rule is False:
+            messagebox.showwarning("Input Error", REPEAT_ERROR)
+            return
+        
+        def update(cursor):
+            cursor.execute(
+                "UPDATE tasks SET title = ?, description = ?, deadline = ?, status = ?, reminder = ?, "
+                "reminder_time = ? WHERE id = ?",
+                (title, description, deadline, status, reminder, reminder_time, task_id)
             )
-            self.conn.commit()
-            
-            self.clear_entries()
-            self.load_tasks()
+            recurrence.save_rule(cursor, task_id, rule)
+            if rule and status == "Completed":
+                recurrence.complete_occurrence(cursor, task_id, rule)
+            cursor.execute(f"SELECT {task_store.TASK_COLUMNS} FROM tasks WHERE id = ?", (task_id,))
+            return cursor.fetchone()
+        
+        def on_updated(row):
+            if rule:
+                self.task_rules[task_id] = rule
+            else:
+                self.task_rules.pop(task_id, None)
+            if row is None:
+                self.task_cache.remove(task_id)
+            else:
+                self.task_cache.put(row)
+            self.refresh_task(task_id)
+            self.reminder_scheduler.notify(task_id)
+            if self.selected_task_id == task_id:
+                self.clear_entries()
             
-            self.status_text.set("Task updated successfully")
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Error updating task: {e}")
+            if rule and status == "Completed" and row and row[4] != "Completed":
+                self.status_text.set(f"Occurrence completed, next one due {row[3]}")
+            else:
+                self.status_text.set("Task updated successfully")
+        
+        self.db_worker.submit(update, on_updated, self.db_error("Error updating task"))
 
     # function for deleting a task from the database 
+    @PROFILER.timed("ui: delete_task")
     def delete_task(self):
-        if not self.selected_task_id:
+        task_ids = self.selected_task_ids()
+        if not task_ids:
             return
         
-        confirm = messagebox.askyesno("Confirm Deletion", "Are you sure you want to delete this task?")
+        if len(task_ids) == 1:
+            question = "Are you sure you want to delete this task?"
+        else:
+            question = f"Are you sure you want to delete these {len(task_ids)} tasks?"
+        confirm = messagebox.askyesno("Confirm Deletion", question)
         if not confirm:
             return
         
-        try:
-            self.cursor.execute("DELETE FROM tasks WHERE id = ?", (self.selected_task_id,))
-            self.conn.commit()
-            
-            self.clear_entries()
-            self.load_tasks()
-            
-            self.status_text.set("Task deleted successfully")
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Error deleting task: {e}")
+        def on_deleted(result):
+            for task_id in task_ids:
+                self.task_rules.pop(task_id, None)
+                self.task_cache.remove(task_id)
+                self.reminder_scheduler.notify(task_id)
+            if len(task_ids) == 1:
+                self.remove_task_item(task_ids[0])
+                self.status_text.set("Task deleted successfully")
+            else:
+                self.refresh_tasks(task_ids)
+                self.status_text.set(f"{len(task_ids)} tasks deleted successfully")
+        
+        def delete(cursor):
+            ids = task_store.ids_param(task_ids)
+            cursor.execute(f"DELETE FROM tasks WHERE {task_store.IDS_SQL}", (ids,))
+            cursor.execute(f"DELETE FROM tasks_archive WHERE {task_store.IDS_SQL}", (ids,))
+        
+        self.db_worker.submit(delete, on_deleted, self.db_error("Error deleting task"))
+        
+        self.clear_entries()
     
     # function for selecting a task from the list of tasks
+    @PROFILER.timed("ui: on_task_select")
     def on_task_select(self, event):
         selected_items = self.task_tree.selection()
         
-        if not selected_items:
+        if not selected_items or set(selected_items) == self.restored_selection:
             return
         
-        item = selected_items[0]
-        values = self.task_tree.item(item, "values")
+        self.restored_selection = set()
+        self.selection_ids = {self.item_tasks[item] for item in selected_items if item in self.item_tasks}
+        if len(selected_items) > 1:
+            self.status_text.set(f"{len(selected_items)} tasks selected")
+        
+        task_id = self.item_tasks.get(selected_items[0], 0)
+        task = self.task_cache.get(task_id)
+        if task is None and not self.cache_ready:
+            self.cursor.execute(f"SELECT {task_store.TASK_COLUMNS} FROM tasks WHERE id = ?", (task_id,))
+            row = self.cursor.fetchone()
+            task = row and Task(*row)
+        if task is None:
+            return
         
         self.update_button.config(state="normal")
         self.delete_button.config(state="normal")
@@ -407,22 +1305,38 @@ class TodoApp:
         self.update_button.config(bg=self.accent_blue)
         self.delete_button.config(bg=self.accent_red)
         
-        self.selected_task_id = values[0]
+        self.selected_task_id = task.id
         self.title_entry.delete(0, tk.END)
-        self.title_entry.insert(0, values[1])
+        self.title_entry.insert(0, task.title)
         
         self.desc_entry.delete(0, tk.END)
-        self.desc_entry.insert(0, values[2])
+        self.desc_entry.insert(0, task.description or "")
         
         try:
-            year, month, day = map(int, values[3].split('-'))
-            self.deadline_entry.set_date(datetime.date(year, month, day))
-        except (ValueError, IndexError):
-            self.deadline_entry.set_date(datetime.date.today())
-        
-        self.status_var.set(values[4])
-        
-        self.reminder_var.set(values[5] == "Yes")
+            year, month, day = map(int, task.deadline.split('-'))
+            self.ensure_deadline_entry().set_date(datetime.date(year, month, day))
+        except (AttributeError, ValueError):
+            self.ensure_deadline_entry().set_date(datetime.date.today())
+        
+        self.status_var.set(task.status)
+        
+        self.reminder_var.set(task.reminder == 1)
+        
+        self.reminder_time_entry.delete(0, tk.END)
+        self.reminder_time_entry.insert(0, task.reminder_time or "")
+        
+        rule = self.task_rules.get(task.id)
+        self.repeat_var.set(next(label for label, frequency in REPEAT_LABELS.items()
+                                 if frequency == (rule.frequency if rule else None)))
+        self.repeat_every_entry.delete(0, tk.END)
+        self.repeat_end_entry.delete(0, tk.END)
+        if rule:
+            if rule.interval > 1:
+                self.repeat_every_entry.insert(0, str(rule.interval))
+            if rule.until:
+                self.repeat_end_entry.insert(0, rule.until.strftime("%Y-%m-%d"))
+            elif rule.count:
+                self.repeat_end_entry.insert(0, str(rule.count))
 
     # function for double clicking on a task
 
@@ -438,153 +1352,596 @@ class TodoApp:
         self.title_entry.focus_set()
         self.status_text.set("Edit task and click Update when done")
     
+    # function for reading the optional reminder time, False when it is malformed
+    def get_reminder_time(self):
+        reminder_time = self.reminder_time_entry.get().strip()
+        if not reminder_time:
+            return None
+        
+        try:
+            return datetime.datetime.strptime(reminder_time, "%H:%M").strftime("%H:%M")
+        except ValueError:
+            return False
+    
+    # function for reading the repeat fields as a recurrence rule starting at the deadline,
+    # None when the task does not repeat and False when the fields are malformed; an
+    # unchanged rule keeps its original start so its occurrences and count carry on
+    def get_rule(self, deadline, current=None):
+        frequency = REPEAT_LABELS[self.repeat_var.get()]
+        if frequency is None:
+            return None
+        
+        try:
+            interval = int(self.repeat_every_entry.get().strip() or 1)
+            until, count = recurrence.parse_end(self.repeat_end_entry.get())
+            rule = recurrence.Rule(frequency, deadline, interval, until, count)
+        except ValueError:
+            return False
+        
+        if current is not None:
+            unchanged = (current.frequency, current.interval, current.until, current.count)
+            if unchanged == (rule.frequency, rule.interval, rule.until, rule.count):
+                return current
+        return rule
+    
     # function for clearing the entries in the input fields
 
     def clear_entries(self):
         self.title_entry.delete(0, tk.END)
         self.desc_entry.delete(0, tk.END)
-        self.deadline_entry.set_date(datetime.date.today())
+        self.ensure_deadline_entry().set_date(datetime.date.today())
         self.status_var.set("Pending")
         self.reminder_var.set(False)
+        self.reminder_time_entry.delete(0, tk.END)
+        self.repeat_var.set("Never")
+        self.repeat_every_entry.delete(0, tk.END)
+        self.repeat_end_entry.delete(0, tk.END)
         
         self.update_button.config(state="disabled", bg=self.dark_accent)
         self.delete_button.config(state="disabled", bg=self.dark_accent)
         
         self.selected_task_id = None
+        self.selection_ids = set()
         
         for item in self.task_tree.selection():
             self.task_tree.selection_remove(item)
     
-    # function for showing the context menu
+    # function for listing the ids of the selected tasks
+    def selected_task_ids(self):
+        task_ids = [self.item_tasks[item] for item in self.task_tree.selection() if item in self.item_tasks]
+        if not task_ids and self.selected_task_id:
+            return [self.selected_task_id]
+        return task_ids
+    
+    # function for showing the context menu for the selection, or for the clicked row
+    # when it is outside the selection
     def show_context_menu(self, event):
         item = self.task_tree.identify_row(event.y)
         if item:
-            self.task_tree.selection_set(item)
+            if item not in self.task_tree.selection():
+                self.task_tree.selection_set(item)
             self.on_task_select(None)
-            self.context_menu.post(event.x_root, event.y_root)
+            self.ensure_context_menu().post(event.x_root, event.y_root)
     
-    # function for changing the status of a task
+    # function for changing the status of the selected tasks
+    @PROFILER.timed("ui: change_status")
     def change_status(self, status):
-        if not self.selected_task_id:
+        task_ids = self.selected_task_ids()
+        if not task_ids:
             return
         
-        try:
-            self.cursor.execute("UPDATE tasks SET status = ? WHERE id = ?", (status, self.selected_task_id))
-            self.conn.commit()
-            
-            self.status_var.set(status)
-            
-            self.load_tasks()
+        rules = {}
+        if status == "Completed":
+            rules = {task_id: self.task_rules[task_id] for task_id in task_ids if task_id in self.task_rules}
+        
+        def change(cursor):
+            cursor.execute(f"UPDATE tasks SET status = ? WHERE {task_store.IDS_SQL}",
+                           (status, task_store.ids_param(task_ids)))
+            if not rules:
+                return []
             
-            self.status_text.set(f"Task marked as {status}")
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Error updating task status: {e}")
+            for task_id, rule in rules.items():
+                recurrence.complete_occurrence(cursor, task_id, rule)
+            cursor.execute(f"SELECT {task_store.TASK_COLUMNS} FROM tasks WHERE {task_store.IDS_SQL}",
+                           (task_store.ids_param(rules),))
+            return cursor.fetchall()
+        
+        def on_changed(recurring_rows):
+            for task_id in task_ids:
+                self.task_cache.update(task_id, status=status)
+                self.reminder_scheduler.notify(task_id)
+            for row in recurring_rows:
+                self.task_cache.put(row)
+            self.refresh_tasks(task_ids)
+            if len(task_ids) == 1:
+                self.status_text.set(f"Task marked as {status}")
+            else:
+                self.status_text.set(f"{len(task_ids)} tasks marked as {status}")
+        
+        self.db_worker.submit(change, on_changed, self.db_error("Error updating task status"))
+        
+        self.status_var.set(status)
     
-    # function for toggling the reminder of a task
+    # function for toggling the reminder of the selected tasks, turning it on for all
+    # of them unless every one already has it on
+    @PROFILER.timed("ui: toggle_reminder")
     def toggle_reminder(self):
-        if not self.selected_task_id:
+        task_ids = self.selected_task_ids()
+        if not task_ids:
             return
+        
+        ids = task_store.ids_param(task_ids)
+        
+        def toggle(cursor):
+            cursor.execute(f"SELECT MIN(reminder = 1) FROM tasks WHERE {task_store.IDS_SQL}", (ids,))
+            new_reminder = 0 if cursor.fetchone()[0] else 1
+            cursor.execute(f"UPDATE tasks SET reminder = ? WHERE {task_store.IDS_SQL}", (new_reminder, ids))
+            return new_reminder
+        
+        def on_toggled(new_reminder):
+            if self.selected_task_id in task_ids:
+                self.reminder_var.set(new_reminder == 1)
             
-        try:
-            self.cursor.execute("SELECT reminder FROM tasks WHERE id = ?", (self.selected_task_id,))
-            current = self.cursor.fetchone()[0]
+            for task_id in task_ids:
+                self.task_cache.update(task_id, reminder=new_reminder)
+                self.reminder_scheduler.notify(task_id)
+            self.refresh_tasks(task_ids)
             
-            new_reminder = 0 if current == 1 else 1
+            status = "enabled" if new_reminder == 1 else "disabled"
+            self.status_text.set(f"Reminder {status}")
+        
+        self.db_worker.submit(toggle, on_toggled, self.db_error("Error toggling reminder"))
+    
+    # function for moving the selected tasks to a new deadline
+    @PROFILER.timed("ui: change_deadline")
+    def change_deadline(self):
+        task_ids = self.selected_task_ids()
+        if not task_ids:
+            return
+        
+        deadline = simpledialog.askstring("Change Deadline", "New deadline (YYYY-MM-DD), empty for none:",
+                                          initialvalue=self.today, parent=self.root)
+        if deadline is None:
+            return
+        
+        deadline = deadline.strip() or None
+        if deadline and not task_store.valid_deadline(deadline):
+            messagebox.showwarning("Input Error", "Deadline must be YYYY-MM-DD")
+            return
+        
+        def on_changed(result):
+            for task_id in task_ids:
+                self.task_cache.update(task_id, deadline=deadline)
+                self.reminder_scheduler.notify(task_id)
+            self.refresh_tasks(task_ids)
+            self.check_due_tasks()
+            self.status_text.set(f"Deadline changed for {len(task_ids)} task{'s' if len(task_ids) > 1 else ''}")
+        
+        self.db_worker.execute(f"UPDATE tasks SET deadline = ? WHERE {task_store.IDS_SQL}",
+                               (deadline, task_store.ids_param(task_ids)),
+                               on_changed, self.db_error("Error changing deadline"))
+    
+    # function for moving completed tasks older than the archive age out of the tasks table,
+    # one batch per write transaction so other writes interleave between batches
+    def archive_completed_tasks(self, archived=0, reschedule=True):
+        before = datetime.date.today() - datetime.timedelta(days=task_store.ARCHIVE_AFTER_DAYS)
+        
+        def on_archived(task_ids):
+            for task_id in task_ids:
+                self.task_cache.remove(task_id)
+            if task_ids:
+                self.refresh_tasks(task_ids)
             
-            self.cursor.execute("UPDATE tasks SET reminder = ? WHERE id = ?", (new_reminder, self.selected_task_id))
-            self.conn.commit()
+            total = archived + len(task_ids)
+            if len(task_ids) == task_store.ARCHIVE_BATCH:
+                self.status_text.set(f"Archiving completed tasks... {total}")
+                self.root.after(10, lambda: self.archive_completed_tasks(total, reschedule))
+                return
             
-            self.reminder_var.set(new_reminder == 1)
+            if total or not reschedule:
+                self.status_text.set(f"Archived {total} completed tasks")
+            if reschedule:
+                self.root.after(ARCHIVE_INTERVAL_MS, self.archive_completed_tasks)
+        
+        self.db_worker.submit(lambda cursor: task_store.archive_completed(cursor, before),
+                              on_archived, self.db_error("Error archiving tasks"))
+    
+    # function for moving the selected archived tasks back into the task list
+    def restore_tasks(self):
+        task_ids = self.selected_task_ids()
+        if not task_ids:
+            return
+        
+        def on_restored(restored):
+            if not restored:
+                self.status_text.set("No archived tasks selected")
+                return
             
+            self.cursor.execute(f"SELECT {task_store.TASK_COLUMNS} FROM tasks WHERE {task_store.IDS_SQL}",
+                                (task_store.ids_param(restored),))
+            for row in self.cursor.fetchall():
+                self.task_cache.put(row)
+                self.reminder_scheduler.notify(row[0])
+            self.refresh_tasks(restored)
+            self.status_text.set(f"Restored {len(restored)} task{'s' if len(restored) > 1 else ''} from the archive")
+        
+        self.db_worker.submit(lambda cursor: task_store.restore_archived(cursor, task_ids),
+                              on_restored, self.db_error("Error restoring tasks"))
+    
+    # function for importing tasks from a CSV or JSON Lines file in one transaction
+    def import_tasks(self):
+        path = filedialog.askopenfilename(
+            title="Import Tasks",
+            filetypes=[("Task files", "*.csv *.jsonl *.ndjson"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        
+        def progress(count):
+            self.db_worker.post(lambda n: self.status_text.set(f"Imported {n} tasks..."), count)
+        
+        def run_import(cursor):
+            return task_io.insert_tasks(cursor, task_io.read_tasks(path), progress=progress)
+        
+        def on_imported(count):
             self.load_tasks()
+            self.reminder_scheduler.notify()
+            self.status_text.set(f"Imported {count} tasks")
+        
+        def on_error(e):
+            messagebox.showerror("Import Error", f"Error importing tasks: {e}")
+        
+        try:
+            task_io.file_format(path)
+        except ValueError as e:
+            messagebox.showwarning("Import Error", str(e))
+            return
+        
+        self.status_text.set("Importing tasks...")
+        self.db_worker.submit(run_import, on_imported, on_error)
+    
+    # function for exporting every task to a CSV or JSON Lines file in the background
+    def export_tasks(self):
+        path = filedialog.asksaveasfilename(
+            title="Export Tasks",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        
+        def progress(count):
+            self.db_worker.post(lambda n: self.status_text.set(f"Exported {n} tasks..."), count)
+        
+        def run_export():
+            try:
+                conn = task_store.connect()
+                try:
+                    count = task_io.export_tasks(conn, path, progress=progress)
+                finally:
+                    conn.close()
+                self.db_worker.post(lambda n: self.status_text.set(f"Exported {n} tasks"), count)
+            except (OSError, ValueError, sqlite3.Error) as e:
+                self.db_worker.post(
+                    lambda error: messagebox.showerror("Export Error", f"Error exporting tasks: {error}"), e
+                )
+        
+        self.status_text.set("Exporting tasks...")
+        threading.Thread(target=run_export, daemon=True).start()
+    
+    # function for switching the hot-path profiler on or off
+    def toggle_profiling(self):
+        PROFILER.enabled = self.profiling_var.get()
+        self.status_text.set(f"Profiling {'enabled' if PROFILER.enabled else 'disabled'}")
+    
+    # function for showing the performance stats window
+    def show_stats_window(self):
+        stats_win = tk.Toplevel(self.root)
+        stats_win.title("Performance Stats")
+        stats_win.configure(bg=self.dark_bg)
+        stats_win.geometry("700x400")
+        
+        columns = ("Name", "Count", "p50 ms", "p95 ms", "p99 ms", "Max ms")
+        stats_tree = ttk.Treeview(stats_win, columns=columns, show="headings", style="Treeview")
+        for col in columns:
+            stats_tree.heading(col, text=col)
+            stats_tree.column(col, width=300 if col == "Name" else 70, anchor="w" if col == "Name" else "e")
+        stats_tree.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        button_row = tk.Frame(stats_win, bg=self.dark_bg)
+        button_row.pack(fill="x", padx=10, pady=(0, 10))
+        
+        for text, command in (("Reset", PROFILER.reset), ("Save JSON...", self.save_stats)):
+            tk.Button(button_row, text=text, command=command, bg=self.dark_accent, fg=self.text_color,
+                      activebackground=self.accent_blue, activeforeground="white",
+                      relief=tk.FLAT, bd=0, padx=10, pady=5).pack(side="left", padx=5)
+        
+        def refresh():
+            if not stats_win.winfo_exists():
+                return
             
-            status = "enabled" if new_reminder == 1 else "disabled"
-            self.status_text.set(f"Reminder {status}")
+            stats_tree.delete(*stats_tree.get_children())
+            for name, row in PROFILER.stats().items():
+                stats_tree.insert("", "end", values=(name, row["count"], row["p50_ms"], row["p95_ms"],
+                                                     row["p99_ms"], row["max_ms"]))
+            stats_win.after(1000, refresh)
+        
+        refresh()
+    
+    # function for saving the profiler samples to a JSON file
+    def save_stats(self):
+        path = filedialog.asksaveasfilename(title="Save Stats", defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        
+        try:
+            PROFILER.dump_json(path)
+            self.status_text.set(f"Stats saved to {path}")
+        except OSError as e:
+            messagebox.showerror("Save Error", f"Error saving stats: {e}")
+    
+    # function for starting a cProfile capture
+    def start_cprofile(self):
+        PROFILER.start_cprofile()
+        self.status_text.set("cProfile capture started")
+    
+    # function for stopping the cProfile capture and saving it
+    def stop_cprofile(self):
+        if PROFILER.cprofile is None:
+            self.status_text.set("No cProfile capture running")
+            return
+        
+        path = filedialog.asksaveasfilename(title="Save cProfile Capture", defaultextension=".prof",
+                                            filetypes=[("cProfile", "*.prof")])
+        if not path:
+            return
+        
+        try:
+            PROFILER.stop_cprofile(path)
+            self.status_text.set(f"cProfile capture saved to {path}")
+        except OSError as e:
+            messagebox.showerror("Save Error", f"Error saving cProfile capture: {e}")
+    
+    # function for building an error callback for a failed database write
+    def db_error(self, message):
+        return lambda e: messagebox.showerror("Database Error", f"{message}: {e}")
+    
+    # function for delivering the results of finished database writes, a failing callback
+    # is logged and never stops the polling
+    def process_db_results(self):
+        try:
+            self.db_worker.process_results()
+        except Exception as e:
+            print(f"Error in database callback: {e!r}")
+        finally:
+            self.root.after(50, self.process_db_results)
+    
+    # function for checking cheaply whether another connection has written to the database
+    def poll_external_changes(self):
+        try:
+            data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self.data_version:
+                self.data_version = data_version
+                self.apply_external_changes()
+                self.refresh_dashboard()
         except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Error toggling reminder: {e}")
+            self.status_text.set(f"Error checking for changes: {e}")
+        
+        self.root.after(CHANGE_POLL_MS, self.poll_external_changes)
+    
+    # function for re-reading only the tasks recorded in the changelog and patching them in
+    @PROFILER.timed("ui: apply_external_changes")
+    def apply_external_changes(self):
+        task_ids, self.change_seq = task_store.changes_since(self.conn, self.change_seq, CHANGE_RELOAD_THRESHOLD)
+        
+        if task_ids is None:
+            self.load_tasks()
+            self.reminder_scheduler.notify()
+        elif task_ids:
+            self.cursor.execute(f"SELECT {task_store.TASK_COLUMNS} FROM tasks WHERE {task_store.IDS_SQL}",
+                                (task_store.ids_param(task_ids),))
+            found = {self.task_cache.put(row).id for row in self.cursor.fetchall()}
+            for task_id in task_ids - found:
+                self.task_cache.remove(task_id)
+            
+            rules = recurrence.load_rules(self.conn, task_ids)
+            for task_id in task_ids:
+                if task_id in rules:
+                    self.task_rules[task_id] = rules[task_id]
+                else:
+                    self.task_rules.pop(task_id, None)
+            
+            self.refresh_tasks(task_ids)
+            for task_id in task_ids:
+                self.reminder_scheduler.notify(task_id)
+        
+        if self.change_seq - self.pruned_seq >= task_store.CHANGELOG_KEEP:
+            self.pruned_seq = self.change_seq
+            self.db_worker.submit(task_store.prune_changes)
+    
+    # function for starting every maintenance job now instead of at the next idle period
+    def run_maintenance(self):
+        self.maintenance_scheduler.run_now()
+        self.status_text.set("Starting database maintenance...")
+    
+    # function for handing a maintenance progress message or result to the UI thread
+    def on_maintenance_report(self, job, message, seconds):
+        self.db_worker.post(self.show_maintenance_report, (job, message, seconds))
+    
+    # function for showing maintenance progress and timing in the status bar, warning
+    # about an integrity check that found problems
+    def show_maintenance_report(self, report):
+        job, message, seconds = report
+        label = job.replace("_", " ").capitalize()
+        if seconds is None:
+            self.status_text.set(f"{label}: {message}...")
+            return
+        
+        self.status_text.set(f"{label}: {message} ({seconds * 1000:.0f} ms)")
+        if job == "integrity_check" and message != "ok":
+            messagebox.showwarning("Database Check", f"The integrity check found problems: {message}")
+    
+    # function for flushing pending writes and closing the application
+    def on_close(self):
+        self.maintenance_scheduler.stop()
+        self.reminder_scheduler.stop()
+        self.db_worker.stop()
+        self.db_worker.process_results()
+        self.conn.close()
+        self.root.destroy()
     
     # function for checking the due tasks
     def check_due_tasks(self):
-        today = datetime.date.today().strftime("%Y-%m-%d")
+        due_count = self.counts.get("due_today", 0)
         
-        try:
-            self.cursor.execute("SELECT title FROM tasks WHERE deadline = ? AND status != 'Completed'", (today,))
-            due_tasks = self.cursor.fetchall()
-            
-            if due_tasks:
-                tasks_str = "\n".join([f"• {task[0]}" for task in due_tasks])
-                messagebox.showinfo("Tasks Due Today", f"You have {len(due_tasks)} tasks due today:\n\n{tasks_str}")
-        except sqlite3.Error as e:
-            print(f"Error checking due tasks: {e}")
+        if not due_count:
+            self.due_banner.pack_forget()
+            return
+        
+        self.cursor.execute(
+            "SELECT title FROM tasks WHERE deadline_day = ? AND status IS NOT 'Completed' LIMIT 5",
+            (self.counts["today"],)
+        )
+        titles = ", ".join(row[0] for row in self.cursor.fetchall())
+        if due_count > 5:
+            titles += f" and {due_count - 5} more"
+        self.due_banner_text.set(f"You have {due_count} tasks due today: {titles}")
+        self.due_banner.pack(fill="x", pady=(0, 5), before=self.tree_frame)
     
-    # function for processing the reminder queue
+    # function for moving the reminders fired since the last tick into the notification window
     def process_reminder_queue(self):
-        try:
-            while not self.reminder_queue.empty():
-                task_title = self.reminder_queue.get_nowait()
-                self.show_reminder(task_title)
-        except queue.Empty:
-            pass
+        reminders, dropped = self.reminder_queue.drain()
+        if reminders or dropped:
+            self.show_reminders(reminders, dropped)
         
         self.root.after(1000, self.process_reminder_queue)
     
-    # function for checking the reminders
-    def reminder_checker(self):
-        while not self.stop_thread:
-            try:
-                with sqlite3.connect("to-do.db") as conn:
-                    cursor = conn.cursor()
-                    
-                    today = datetime.date.today().strftime("%Y-%m-%d")
-                    cursor.execute(
-                        "SELECT id, title FROM tasks WHERE reminder = 1 AND status != 'Completed' AND deadline = ?",
-                        (today,)
-                    )
-                    tasks = cursor.fetchall()
-                    
-                    for task in tasks:
-                        self.reminder_queue.put(task[1])
-            except Exception as e:
-                print(f"Error in reminder checker: {e}")
-                
-            for _ in range(360):
-                if self.stop_thread:
-                    break
-                time.sleep(10)
-    
-    # function for showing the reminder
-    def show_reminder(self, task_title):
-        reminder_win = tk.Toplevel(self.root)
-        reminder_win.title("Task Reminder")
-        reminder_win.configure(bg=self.dark_secondary)
-        reminder_win.geometry("350x200")
-        reminder_win.resizable(False, False)
-        reminder_win.lift()
-        reminder_win.focus_force()
-        
-        reminder_win.attributes("-topmost", True)
-        
-        reminder_frame = tk.Frame(reminder_win, bg=self.dark_secondary, bd=2, relief=tk.GROOVE,
-                                padx=20, pady=20)
-        reminder_frame.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        title_label = tk.Label(reminder_frame, text="⏰ Reminder", font=self.title_font,
-                             bg=self.dark_secondary, fg=self.accent_blue)
-        title_label.pack(pady=(0, 10))
-        
-        task_text = f"Task due today:\n\n{task_title}"
-        task_label = tk.Label(reminder_frame, text=task_text, wraplength=300,
-                            bg=self.dark_secondary, fg=self.text_color, justify="center")
-        task_label.pack(pady=10)
-        
-        close_btn = tk.Button(reminder_frame, text="Dismiss", command=reminder_win.destroy,
-                            bg=self.accent_blue, fg="white", relief=tk.FLAT, bd=0,
-                            activebackground=self.dark_accent, activeforeground="white",
-                            padx=20, pady=5)
-        close_btn.pack(pady=10)
+    # function for queueing a reminder fired by the scheduler thread
+    def on_reminder_due(self, task_id, task_title):
+        self.reminder_queue.put(task_id, task_title)
+    
+    # function for building the reminder notification window the first time it is needed,
+    # it is hidden rather than destroyed so the same widgets serve every reminder
+    def ensure_reminder_window(self):
+        if self.reminder_window is None:
+            reminder_win = tk.Toplevel(self.root)
+            reminder_win.title("Task Reminders")
+            reminder_win.configure(bg=self.dark_secondary)
+            reminder_win.geometry("420x320")
+            reminder_win.attributes("-topmost", True)
+            reminder_win.protocol("WM_DELETE_WINDOW", self.dismiss_all_reminders)
+            
+            reminder_frame = tk.Frame(reminder_win, bg=self.dark_secondary, bd=2, relief=tk.GROOVE,
+                                      padx=10, pady=10)
+            reminder_frame.pack(fill="both", expand=True, padx=10, pady=10)
+            
+            self.reminder_heading = tk.StringVar()
+            tk.Label(reminder_frame, textvariable=self.reminder_heading, font=self.title_font,
+                     bg=self.dark_secondary, fg=self.accent_blue).pack(pady=(0, 10))
+            
+            list_frame = tk.Frame(reminder_frame, bg=self.dark_secondary)
+            list_frame.pack(fill="both", expand=True)
+            
+            self.reminder_list = ttk.Treeview(list_frame, columns=("Task",), show="headings", style="Treeview",
+                                              selectmode="extended")
+            self.reminder_list.heading("Task", text="Task due today")
+            reminder_scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.reminder_list.yview)
+            self.reminder_list.configure(yscrollcommand=reminder_scrollbar.set)
+            reminder_scrollbar.pack(side="right", fill="y")
+            self.reminder_list.pack(side="left", fill="both", expand=True)
+            
+            button_frame = tk.Frame(reminder_frame, bg=self.dark_secondary)
+            button_frame.pack(fill="x", pady=(10, 0))
+            
+            for text, command in (("Snooze", self.snooze_reminders),
+                                  ("Dismiss", self.dismiss_reminders),
+                                  ("Snooze All", lambda: self.snooze_reminders(all_reminders=True)),
+                                  ("Dismiss All", self.dismiss_all_reminders)):
+                tk.Button(button_frame, text=text, command=command,
+                          bg=self.accent_blue, fg="white", relief=tk.FLAT, bd=0,
+                          activebackground=self.dark_accent, activeforeground="white",
+                          padx=10, pady=5).pack(side="left", padx=(0, 5))
+            
+            self.reminder_window = reminder_win
+        return self.reminder_window
+    
+    # function for adding fired reminders to the notification window, one row per task
+    @PROFILER.timed("ui: show_reminders")
+    def show_reminders(self, reminders, dropped=0):
+        reminder_win = self.ensure_reminder_window()
+        was_hidden = not self.reminder_list.get_children()
+        
+        for task_id, task_title in reminders:
+            item = str(task_id)
+            if self.reminder_list.exists(item):
+                self.reminder_list.item(item, values=(task_title,))
+            else:
+                self.reminder_list.insert("", "end", iid=item, values=(task_title,))
+        
+        self.reminder_dropped += dropped
+        self.update_reminder_heading()
+        
+        if was_hidden:
+            reminder_win.deiconify()
+            reminder_win.lift()
+            reminder_win.focus_force()
+    
+    # function for showing how many reminders are waiting in the window heading
+    def update_reminder_heading(self):
+        count = len(self.reminder_list.get_children())
+        heading = f"⏰ {count} Reminder{'s' if count != 1 else ''}"
+        if self.reminder_dropped:
+            heading += f" (+{self.reminder_dropped} not shown)"
+        self.reminder_heading.set(heading)
+    
+    # function for taking reminders off the window, hiding it once it is empty
+    def remove_reminders(self, items):
+        if items:
+            self.reminder_list.delete(*items)
+        
+        if self.reminder_list.get_children():
+            self.update_reminder_heading()
+        else:
+            self.reminder_dropped = 0
+            self.reminder_window.withdraw()
+    
+    # function for snoozing the selected reminders, or every reminder in the window
+    def snooze_reminders(self, all_reminders=False):
+        items = self.reminder_list.get_children() if all_reminders else self.reminder_list.selection()
+        for item in items:
+            task_title = str(self.reminder_list.item(item, "values")[0])
+            self.reminder_scheduler.snooze(int(item), task_title, SNOOZE_MINUTES * 60)
+        
+        self.remove_reminders(items)
+        if items:
+            self.status_text.set(f"Snoozed {len(items)} reminder{'s' if len(items) > 1 else ''} "
+                                 f"for {SNOOZE_MINUTES} minutes")
+    
+    # function for dismissing the selected reminders
+    def dismiss_reminders(self):
+        self.remove_reminders(self.reminder_list.selection())
+    
+    # function for dismissing every reminder in the window
+    def dismiss_all_reminders(self):
+        self.remove_reminders(self.reminder_list.get_children())
 
     # the main script for running the application
 if __name__ == "__main__":
     root = tk.Tk()
     app = TodoApp(root)
-    root.mainloop()
\ No newline at end of file
+    
+    if "--measure-startup" in sys.argv:
+        # on_first_paint flushes idle callbacks itself, so wait until it has measured
+        def report_startup():
+            if app.startup_ms is None:
+                root.after(10, report_startup)
+                return
+            print(f"Startup: {app.startup_ms:.1f} ms (budget {STARTUP_BUDGET_MS:.0f} ms)")
+            app.on_close()
+        root.after_idle(report_startup)
+    
+    root.mainloop()
+    
+    if "--measure-startup" in sys.argv:
+        sys.exit(0 if app.startup_ms <= STARTUP_BUDGET_MS else 1)
\ No newline at end of file
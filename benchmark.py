@@ -0,0 +1,218 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+
+import task_io
+import task_store
+from reminder_scheduler import REMINDER_SQL
+
+SIZES = (1000, 10000, 100000, 1000000)
+# tasks loaded per run of the import benchmark, and how many runs it gets at most
+IMPORT_ROWS = 20000
+IMPORT_RUNS = 3
+STATUSES = ("Pending", "In Progress", "Completed")
+STATUS_WEIGHTS = (50, 20, 30)
+WORDS = ("report", "email", "review", "call", "invoice", "meeting", "plan", "fix",
+         "update", "draft", "groceries", "budget", "deploy", "backup", "design")
+
+# function for generating synthetic tasks with deadlines spread around today
+def synthetic_tasks(count, seed=0):
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    
+    for i in range(count):
+        title = " ".join(rng.choices(WORDS, k=3)) + f" #{i}"
+        status = rng.choices(STATUSES, STATUS_WEIGHTS)[0]
+        
+        if rng.random() < 0.05:
+            deadline = None
+        else:
+            offset = int(rng.gauss(0, 45))
+            deadline = (today + datetime.timedelta(days=offset)).strftime("%Y-%m-%d")
+        
+        reminder = 1 if rng.random() < 0.2 else 0
+        reminder_time = f"{rng.randint(7, 20):02d}:{rng.choice((0, 30)):02d}" if reminder and rng.random() < 0.5 else None
+        yield (title, " ".join(rng.choices(WORDS, k=8)), deadline, status, reminder, reminder_time)
+
+# function for creating (or reusing) a synthetic database with a given number of tasks,
+# migrating a reused one up front so no timed run pays for it
+def build_database(path, count):
+    if os.path.exists(path):
+        task_store.connect(path).close()
+        return path
+    
+    conn = task_store.connect(path + ".tmp", isolation_level=None)
+    conn.execute("BEGIN")
+    task_io.insert_tasks(conn.cursor(), synthetic_tasks(count))
+    conn.execute("COMMIT")
+    conn.execute("ANALYZE")
+    conn.close()
+    
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(path + ".tmp" + suffix):
+            os.remove(path + ".tmp" + suffix)
+    os.replace(path + ".tmp", path)
+    return path
+
+# function for copying a database with the backup API, so mutations never touch the original
+def scratch_copy(path):
+    scratch = path + ".scratch"
+    remove_database(scratch)
+    
+    source, target = sqlite3.connect(path), sqlite3.connect(scratch)
+    source.backup(target)
+    target.close()
+    source.close()
+    return scratch
+
+# function for deleting a database file with its WAL and shared-memory files
+def remove_database(path):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+# function for timing a callable several times, returning milliseconds per run
+def time_runs(operation, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+# function for summarising timings into a result record
+def summarise(size, name, timings):
+    ordered = sorted(timings)
+    return {
+        "size": size,
+        "operation": name,
+        "runs": len(ordered),
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+# function for benchmarking the data layer operations on one database, the writes going
+# to a scratch copy so every run measures the same data
+def run_benchmarks(path, size, runs):
+    today = datetime.date.today()
+    results = []
+    
+    def cold_start():
+        conn = task_store.connect(path, isolation_level=None)
+        conn.execute("SELECT COUNT(*) FROM tasks").fetchone()
+        conn.execute(f"SELECT {task_store.TASK_COLUMNS} FROM tasks ORDER BY id LIMIT 100").fetchall()
+        conn.close()
+    
+    results.append(summarise(size, "cold_start", time_runs(cold_start, runs)))
+    
+    conn = task_store.connect(path, isolation_level=None)
+    
+    def warm_refresh():
+        conn.execute(f"SELECT {task_store.TASK_COLUMNS} FROM tasks").fetchall()
+    
+    def first_page():
+        conn.execute("SELECT COUNT(*) FROM tasks").fetchone()
+        conn.execute(f"SELECT {task_store.TASK_COLUMNS} FROM tasks ORDER BY id LIMIT 100").fetchall()
+    
+    due_where, due_params = task_store.deadline_filter("today", today)
+    
+    def due_today_scan():
+        conn.execute(f"SELECT title FROM tasks WHERE {due_where} AND status IS NOT 'Completed'",
+                     due_params).fetchall()
+    
+    def reminder_scan():
+        conn.execute(REMINDER_SQL, (today.strftime("%Y-%m-%d"),)).fetchall()
+    
+    results.append(summarise(size, "warm_refresh", time_runs(warm_refresh, runs)))
+    results.append(summarise(size, "first_page", time_runs(first_page, runs)))
+    results.append(summarise(size, "due_today_scan", time_runs(due_today_scan, runs)))
+    results.append(summarise(size, "reminder_scan", time_runs(reminder_scan, runs)))
+    conn.close()
+    
+    scratch = scratch_copy(path)
+    conn = task_store.connect(scratch, isolation_level=None)
+    
+    rng = random.Random(1)
+    max_id = conn.execute("SELECT MAX(id) FROM tasks").fetchone()[0] or 0
+    task_ids = rng.sample(range(1, max_id + 1), min(runs, max_id))
+    statuses = iter(rng.choices(STATUSES, k=runs))
+    targets = iter(task_ids)
+    
+    def single_mutation():
+        conn.execute("UPDATE tasks SET status = ? WHERE id = ?", (next(statuses), next(targets)))
+    
+    def add_task():
+        conn.execute(task_io.INSERT_SQL, ("benchmark task", "", today.strftime("%Y-%m-%d"), "Pending", 0, None))
+    
+    def bulk_import():
+        conn.execute("BEGIN")
+        task_io.insert_tasks(conn.cursor(), synthetic_tasks(IMPORT_ROWS, seed=1))
+        conn.execute("ROLLBACK")
+    
+    results.append(summarise(size, "single_mutation", time_runs(single_mutation, len(task_ids))))
+    results.append(summarise(size, "add_task", time_runs(add_task, runs)))
+    
+    imported = summarise(size, f"import_{IMPORT_ROWS}", time_runs(bulk_import, min(runs, IMPORT_RUNS)))
+    imported["rows_per_s"] = round(IMPORT_ROWS / (imported["median_ms"] / 1000))
+    results.append(imported)
+    
+    conn.close()
+    remove_database(scratch)
+    return results
+
+# function for describing the environment the benchmark ran in
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    
+    return {
+        "commit": commit or None,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "synchronous": task_store.SYNCHRONOUS,
+    }
+
+# function for the command line interface
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the to-do task store at several table sizes")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in SIZES),
+                        help="comma separated task counts (default: %(default)s)")
+    parser.add_argument("--runs", type=int, default=20, help="timed runs per operation")
+    parser.add_argument("--data-dir", default="bench_data", help="where synthetic databases are kept")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+    
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = []
+    
+    for size in (int(size) for size in args.sizes.split(",")):
+        path = os.path.join(args.data_dir, f"tasks-{size}.db")
+        print(f"Benchmarking {size} tasks...", file=sys.stderr)
+        build_database(path, size)
+        results.extend(run_benchmarks(path, size, args.runs))
+    
+    report = json.dumps({"environment": environment(), "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
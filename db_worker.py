@@ -0,0 +1,141 @@
+import queue
+import sqlite3
+import threading
+import time
+
+import task_store
+from profiler import PROFILER, ProfiledCursor
+
+# how long the worker waits for more writes to join a transaction, in seconds
+COALESCE_DELAY = 0.005
+# most operations committed together in a single transaction
+MAX_BATCH = 500
+
+# class for running database writes on a dedicated thread, committing bursts
+# of operations together and handing results back to the caller's thread
+class DatabaseWorker:
+    # function for initializing the worker and its connection settings
+    def __init__(self, db_path=task_store.DB_PATH, synchronous=task_store.SYNCHRONOUS):
+        self.db_path = db_path
+        self.synchronous = synchronous
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+    
+    # function for starting the worker thread
+    def start(self):
+        self.thread.start()
+    
+    # function for finishing every queued write and stopping the worker thread
+    def stop(self):
+        self.requests.put(None)
+        self.thread.join()
+    
+    # function for queueing an operation, called on the worker thread with a cursor;
+    # callback receives its return value and error_callback any exception it raised,
+    # which is logged when there is no error_callback
+    def submit(self, operation, callback=None, error_callback=None):
+        self.requests.put((operation, callback, error_callback or self.log_error, time.perf_counter()))
+    
+    # function for logging the error of an operation queued without an error_callback
+    def log_error(self, error):
+        print(f"Error in database worker: {error!r}")
+    
+    # function for queueing a single statement, the callback receives the new lastrowid
+    def execute(self, sql, params=(), callback=None, error_callback=None):
+        def operation(cursor):
+            cursor.execute(sql, params)
+            return cursor.lastrowid
+        self.submit(operation, callback, error_callback)
+    
+    # function for queueing a statement over many parameter sets, the callback receives the rowcount
+    def executemany(self, sql, seq_of_params, callback=None, error_callback=None):
+        def operation(cursor):
+            cursor.executemany(sql, seq_of_params)
+            return cursor.rowcount
+        self.submit(operation, callback, error_callback)
+    
+    # function for handing a value from any thread to a callback run by process_results
+    def post(self, callback, result=None):
+        self.results.put((callback, result, None, None))
+    
+    # function for delivering finished results, to be called from the thread that owns the callbacks;
+    # each callback is timed, and for submitted operations so is the round trip from submit
+    def process_results(self):
+        while True:
+            try:
+                callback, result, error, submitted = self.results.get_nowait()
+            except queue.Empty:
+                break
+            
+            if callback is not None:
+                name = getattr(callback, "__name__", "callback")
+                with PROFILER.measure(f"ui: {name}"):
+                    callback(error if error is not None else result)
+                if submitted is not None and PROFILER.enabled:
+                    PROFILER.record(f"round trip: {name}", time.perf_counter() - submitted)
+    
+    # function for collecting the next burst of queued operations
+    def next_batch(self):
+        batch = [self.requests.get()]
+        if batch[0] is None:
+            return batch
+        
+        time.sleep(COALESCE_DELAY)
+        while len(batch) < MAX_BATCH:
+            try:
+                request = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            if request is None:
+                break
+        return batch
+    
+    # function for running one batch of operations inside a single transaction, each operation
+    # getting a cursor that times its statements
+    def run_batch(self, conn, batch):
+        cursor = conn.cursor()
+        profiled = ProfiledCursor(cursor, PROFILER) if PROFILER.enabled else cursor
+        done = []
+        
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for operation, callback, error_callback, submitted in batch:
+                cursor.execute("SAVEPOINT operation")
+                try:
+                    with PROFILER.measure("worker: operation"):
+                        result = operation(profiled)
+                    cursor.execute("RELEASE operation")
+                    done.append((callback, result, None, submitted))
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO operation")
+                    cursor.execute("RELEASE operation")
+                    done.append((error_callback, None, e, submitted))
+            with PROFILER.measure("worker: commit"):
+                conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            conn.rollback()
+            done = [(error_callback, None, e, submitted) for _, _, error_callback, submitted in batch]
+        
+        for result in done:
+            self.results.put(result)
+    
+    # function for the worker loop
+    def run(self):
+        conn = task_store.connect(self.db_path, synchronous=self.synchronous, isolation_level=None)
+        
+        while True:
+            batch = self.next_batch()
+            stopping = batch[-1] is None
+            if stopping:
+                batch.pop()
+            
+            if batch:
+                with PROFILER.measure("worker: batch"):
+                    self.run_batch(conn, batch)
+            
+            if stopping:
+                break
+        
+        conn.close()
@@ -0,0 +1,230 @@
+import datetime
+import glob
+import os
+import sqlite3
+import threading
+import time
+
+import task_store
+from profiler import PROFILER
+
+# seconds without writes from any connection before maintenance starts
+IDLE_SECONDS = int(os.environ.get("TODO_MAINTENANCE_IDLE_SECONDS", "60"))
+# how often the scheduler checks whether the database is idle, in seconds
+CHECK_INTERVAL = 5
+# seconds between runs of each job, in the order the jobs run
+JOB_INTERVALS = {
+    "optimize": 3600,
+    "vacuum": 3600,
+    "integrity_check": 24 * 3600,
+    "snapshot": 6 * 3600,
+}
+# directory for snapshots, relative to the database, and how many are kept
+SNAPSHOT_DIR = os.environ.get("TODO_SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_KEEP = 3
+# pages copied per backup step, and the pause after each step that lets writers in, in seconds
+BACKUP_PAGES = 256
+STEP_PAUSE = 0.05
+# times a snapshot may restart because another connection wrote under it before it is postponed
+BACKUP_RESTARTS = 3
+# pages released per incremental vacuum transaction
+VACUUM_PAGES = 256
+# share of free pages above which a file without incremental vacuum is rebuilt once, only when
+# it has at most VACUUM_CONVERT_PAGES pages since the rebuild holds the write lock throughout
+VACUUM_FREE_RATIO = 0.25
+VACUUM_CONVERT_PAGES = 5000
+# rows sampled per index when PRAGMA optimize re-analyzes a table
+ANALYSIS_LIMIT = 400
+# how long a maintenance step waits for a lock before giving way, in milliseconds
+BUSY_TIMEOUT_MS = 100
+# most problems listed by the integrity check
+INTEGRITY_MAX_ERRORS = 10
+
+# class for a job that gave way and will be retried in the next idle period
+class Postponed(Exception):
+    pass
+
+# class for running database maintenance from a background thread while the database is idle,
+# split into short steps so add_task and the reminder thread never wait long on a lock
+class MaintenanceScheduler:
+    # function for initializing the scheduler, on_report is called with (job, message, seconds),
+    # seconds being None for progress messages
+    def __init__(self, on_report, db_path=task_store.DB_PATH):
+        self.on_report = on_report
+        self.db_path = db_path
+        self.snapshot_dir = os.path.join(os.path.dirname(db_path), SNAPSHOT_DIR)
+        self.condition = threading.Condition()
+        self.data_version = None
+        self.quiet_since = time.monotonic()
+        self.forced = False
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+    
+    # function for starting the scheduler thread
+    def start(self):
+        self.thread.start()
+    
+    # function for stopping the scheduler thread, a running job stops at its next step
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+    
+    # function for running every job straight away, without waiting for the database to be idle
+    def run_now(self):
+        with self.condition:
+            self.forced = True
+            self.condition.notify()
+    
+    # function for checking whether another connection wrote since the last check
+    def written(self, conn):
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        changed = version != self.data_version
+        if changed:
+            self.data_version = version
+            self.quiet_since = time.monotonic()
+        return changed
+    
+    # function for waiting between two steps of a job, raising Postponed once stopped
+    def pause(self):
+        with self.condition:
+            if not self.stopped:
+                self.condition.wait(STEP_PAUSE)
+            if self.stopped:
+                raise Postponed("stopped")
+    
+    # function for running a single statement in its own short write transaction; executescript
+    # steps it to completion, where execute stops PRAGMA incremental_vacuum after one page
+    def write_step(self, conn, sql):
+        try:
+            conn.executescript(f"BEGIN IMMEDIATE; {sql}; COMMIT;")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+    
+    # function for refreshing the query planner statistics of tables that need it
+    def optimize(self, conn):
+        conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        conn.execute("PRAGMA optimize")
+        return "statistics up to date"
+    
+    # function for returning free pages to the file system a few pages per transaction
+    def vacuum(self, conn):
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            if free <= pages * VACUUM_FREE_RATIO:
+                return f"{free} of {pages} pages free"
+            if pages > VACUUM_CONVERT_PAGES:
+                return f"{free} of {pages} pages free, too large to rebuild while in use"
+            conn.execute("VACUUM")
+            return f"rebuilt for incremental vacuum, {free} pages released"
+        
+        released = 0
+        while free:
+            self.pause()
+            self.write_step(conn, f"PRAGMA incremental_vacuum({VACUUM_PAGES})")
+            left = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if left >= free:
+                break
+            released += free - left
+            free = left
+            self.report("vacuum", f"{released} pages released, {free} left")
+        
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        return f"{released} pages released"
+    
+    # function for checking the whole file for corruption, a read transaction that never blocks writers
+    def integrity_check(self, conn):
+        problems = [row[0] for row in conn.execute(f"PRAGMA integrity_check({INTEGRITY_MAX_ERRORS})")]
+        return "ok" if problems == ["ok"] else "; ".join(problems)
+    
+    # function for copying the database into a new snapshot file with the online backup API,
+    # a few pages per step, keeping only the newest SNAPSHOT_KEEP snapshots
+    def snapshot(self, conn):
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        name = os.path.splitext(os.path.basename(self.db_path))[0]
+        path = os.path.join(self.snapshot_dir, f"{name}-{datetime.datetime.now():%Y%m%d-%H%M%S}.db")
+        partial = path + ".partial"
+        for stale in glob.glob(os.path.join(self.snapshot_dir, f"{name}-*.db.partial")):
+            os.remove(stale)
+        
+        state = {"remaining": None, "restarts": 0}
+        
+        def progress(status, remaining, total):
+            if self.stopped:
+                raise Postponed("stopped")
+            if state["remaining"] is not None and remaining > state["remaining"]:
+                state["restarts"] += 1
+                if state["restarts"] > BACKUP_RESTARTS:
+                    raise Postponed("the database kept changing")
+            state["remaining"] = remaining
+            self.report("snapshot", f"{total - remaining} of {total} pages copied")
+        
+        target = sqlite3.connect(partial)
+        try:
+            conn.backup(target, pages=BACKUP_PAGES, progress=progress, sleep=STEP_PAUSE)
+        except BaseException:
+            target.close()
+            os.remove(partial)
+            raise
+        target.close()
+        os.replace(partial, path)
+        
+        for old in sorted(glob.glob(os.path.join(self.snapshot_dir, f"{name}-*.db")))[:-SNAPSHOT_KEEP]:
+            os.remove(old)
+        return f"saved {path}"
+    
+    # function for passing a progress message or a job result to on_report
+    def report(self, job, message, seconds=None):
+        self.on_report(job, message, seconds)
+    
+    # function for running the jobs that are due, recording when each finished and how long it took
+    def run_jobs(self, conn, forced):
+        last_runs = dict(conn.execute("SELECT job, finished_at FROM maintenance_runs").fetchall())
+        
+        for job, interval in JOB_INTERVALS.items():
+            if self.stopped:
+                return
+            if not forced and (time.time() - last_runs.get(job, 0) < interval or self.written(conn)):
+                continue
+            
+            start = time.perf_counter()
+            try:
+                result = getattr(self, job)(conn)
+            except (Postponed, sqlite3.OperationalError) as e:
+                self.report(job, f"postponed, {e}")
+                continue
+            
+            seconds = time.perf_counter() - start
+            PROFILER.record(f"maintenance: {job}", seconds)
+            conn.execute("INSERT OR REPLACE INTO maintenance_runs (job, finished_at, seconds, result) "
+                         "VALUES (?, ?, ?, ?)", (job, time.time(), seconds, result))
+            self.report(job, result, seconds)
+    
+    # function for the scheduler loop, checking every CHECK_INTERVAL seconds for an idle database
+    def run(self):
+        conn = None
+        
+        while True:
+            with self.condition:
+                if not self.stopped and not self.forced:
+                    self.condition.wait(CHECK_INTERVAL)
+                if self.stopped:
+                    break
+                forced, self.forced = self.forced, False
+            
+            try:
+                if conn is None:
+                    conn = task_store.connect(self.db_path, isolation_level=None)
+                    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+                
+                if forced or (not self.written(conn) and time.monotonic() - self.quiet_since >= IDLE_SECONDS):
+                    self.run_jobs(conn, forced)
+            except Exception as e:
+                print(f"Error in maintenance scheduler: {e}")
+        
+        if conn is not None:
+            conn.close()
@@ -0,0 +1,157 @@
+import collections
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import re
+import threading
+import time
+
+# most recent samples kept per measured name
+MAX_SAMPLES = 10000
+# longest statement name, longer normalised statements are cut
+STATEMENT_NAME_LENGTH = 160
+
+# class for recording latency samples of named hot paths
+class Profiler:
+    # function for initializing the profiler
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.samples = collections.defaultdict(lambda: collections.deque(maxlen=MAX_SAMPLES))
+        self.counts = collections.Counter()
+        self.cprofile = None
+    
+    # function for recording one measurement in seconds
+    def record(self, name, seconds):
+        with self.lock:
+            self.samples[name].append(seconds)
+            self.counts[name] += 1
+    
+    # function for timing a block of code under a name
+    @contextlib.contextmanager
+    def measure(self, name):
+        if not self.enabled:
+            yield
+            return
+        
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+    
+    # function for building a decorator that times every call of a function
+    def timed(self, name):
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.measure(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    # function for clearing every recorded sample
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+            self.counts.clear()
+    
+    # function for summarising the samples as counts and p50/p95/p99/max in milliseconds
+    def stats(self):
+        with self.lock:
+            snapshot = {name: sorted(samples) for name, samples in self.samples.items()}
+            counts = dict(self.counts)
+        
+        stats = {}
+        for name, ordered in sorted(snapshot.items()):
+            if not ordered:
+                continue
+            
+            def percentile(p):
+                return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000, 3)
+            
+            stats[name] = {
+                "count": counts[name],
+                "p50_ms": percentile(0.50),
+                "p95_ms": percentile(0.95),
+                "p99_ms": percentile(0.99),
+                "max_ms": round(ordered[-1] * 1000, 3),
+            }
+        return stats
+    
+    # function for writing the summary and raw samples to a JSON file
+    def dump_json(self, path):
+        with self.lock:
+            samples = {name: [round(s * 1000, 3) for s in values] for name, values in self.samples.items()}
+        
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"stats": self.stats(), "samples_ms": samples}, f, indent=2)
+    
+    # function for starting a cProfile capture of the whole application
+    def start_cprofile(self):
+        if self.cprofile is None:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+    
+    # function for stopping the cProfile capture and saving it for pstats or snakeviz
+    def stop_cprofile(self, path):
+        if self.cprofile is None:
+            return
+        
+        self.cprofile.disable()
+        self.cprofile.dump_stats(path)
+        self.cprofile = None
+
+# class for a cursor wrapper that times each statement it executes
+class ProfiledCursor:
+    # function for wrapping a sqlite3 cursor
+    def __init__(self, cursor, profiler):
+        self.cursor = cursor
+        self.profiler = profiler
+    
+    # function for naming a statement by its shape: literal values become ?, and selected
+    # column lists of more than one column and the assigned or inserted column lists become ...,
+    # so statements are told apart by their tables, conditions and ordering instead of their
+    # shared column list
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def statement_name(sql):
+        sql = re.sub(r"\s+", " ", sql).strip()
+        sql = re.sub(r"'(?:[^']|'')*'|\b\d+\b", "?", sql)
+        sql = re.sub(r"^(SELECT )([^,]+?,.+?)( FROM )", r"\1...\3", sql, count=1, flags=re.IGNORECASE)
+        sql = re.sub(r"^(UPDATE \w+ SET )(.+?)( WHERE |$)", r"\1...\3", sql, count=1, flags=re.IGNORECASE)
+        sql = re.sub(r"^(INSERT (?:OR \w+ )?INTO \w+ )\(.*?\)", r"\1(...)", sql, count=1, flags=re.IGNORECASE)
+        return "db: " + sql[:STATEMENT_NAME_LENGTH]
+    
+    # function for executing and timing a statement
+    def execute(self, sql, params=()):
+        with self.profiler.measure(self.statement_name(sql)):
+            return self.cursor.execute(sql, params)
+    
+    # function for executing and timing a statement over many parameter sets
+    def executemany(self, sql, seq_of_params):
+        with self.profiler.measure(self.statement_name(sql)):
+            return self.cursor.executemany(sql, seq_of_params)
+    
+    # function for fetching and timing one row
+    def fetchone(self):
+        with self.profiler.measure("db: fetchone"):
+            return self.cursor.fetchone()
+    
+    # function for fetching and timing all remaining rows
+    def fetchall(self):
+        with self.profiler.measure("db: fetchall"):
+            return self.cursor.fetchall()
+    
+    # function for fetching and timing the next chunk of rows
+    def fetchmany(self, size=None):
+        with self.profiler.measure("db: fetchmany"):
+            return self.cursor.fetchmany(size) if size is not None else self.cursor.fetchmany()
+    
+    # function for passing every other attribute through to the wrapped cursor
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+PROFILER = Profiler(enabled=os.environ.get("TODO_PROFILE", "") not in ("", "0"))
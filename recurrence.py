@@ -0,0 +1,137 @@
+import calendar
+import datetime
+
+import task_store
+
+# recurrence frequencies, each repeating every <interval> days, weeks or months
+FREQUENCIES = ("daily", "weekly", "monthly")
+# columns of task_rules after task_id, in Rule argument order
+RULE_COLUMNS = "frequency, start, interval, until, count"
+
+# class for a recurrence rule whose occurrences are generated on demand, never stored
+class Rule:
+    # function for initializing a rule from its frequency, first date and end conditions
+    def __init__(self, frequency, start, interval=1, until=None, count=None):
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"frequency must be one of {', '.join(FREQUENCIES)}")
+        if int(interval) < 1:
+            raise ValueError("interval must be at least 1")
+        if count is not None and int(count) < 1:
+            raise ValueError("count must be at least 1")
+        
+        self.frequency = frequency
+        self.start = as_date(start)
+        self.interval = int(interval)
+        self.until = as_date(until) if until else None
+        self.count = int(count) if count is not None else None
+    
+    # function for building a rule from a task_rules row in RULE_COLUMNS order
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row)
+    
+    # function for returning the rule as parameters in RULE_COLUMNS order
+    def as_row(self):
+        return (self.frequency, self.start.strftime("%Y-%m-%d"), self.interval,
+                self.until.strftime("%Y-%m-%d") if self.until else None, self.count)
+    
+    # function for finding the nth occurrence date, counting the start as 0
+    def nth(self, n):
+        if self.frequency == "monthly":
+            month = self.start.month - 1 + n * self.interval
+            year = self.start.year + month // 12
+            month = month % 12 + 1
+            return datetime.date(year, month, min(self.start.day, calendar.monthrange(year, month)[1]))
+        
+        step = 7 * self.interval if self.frequency == "weekly" else self.interval
+        return self.start + datetime.timedelta(days=n * step)
+    
+    # function for estimating the index of the first occurrence on or after a date,
+    # never past it, so generation can start there instead of at the rule's start
+    def first_index(self, day):
+        if day <= self.start:
+            return 0
+        if self.frequency == "monthly":
+            months = (day.year - self.start.year) * 12 + day.month - self.start.month
+            return max(0, months // self.interval - 1)
+        
+        step = 7 * self.interval if self.frequency == "weekly" else self.interval
+        return (day - self.start).days // step
+    
+    # function for lazily yielding the occurrence dates between two dates, inclusive,
+    # an open end keeps yielding until the rule's own end condition
+    def occurrences(self, window_start=None, window_end=None):
+        n = self.first_index(window_start) if window_start else 0
+        
+        while self.count is None or n < self.count:
+            day = self.nth(n)
+            if (self.until and day > self.until) or (window_end and day > window_end):
+                return
+            if not window_start or day >= window_start:
+                yield day
+            n += 1
+    
+    # function for finding the first occurrence after a date that is not in a set of dates
+    def next_after(self, day, skip=()):
+        for occurrence in self.occurrences(day + datetime.timedelta(days=1)):
+            if occurrence not in skip:
+                return occurrence
+        return None
+
+# function for reading a YYYY-MM-DD string or date as a date
+def as_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+
+# function for reading the rules of every recurring task, keyed by task id
+def load_rules(conn, task_ids=None):
+    query = f"SELECT task_id, {RULE_COLUMNS} FROM task_rules"
+    params = ()
+    if task_ids is not None:
+        query += " WHERE task_id IN (SELECT value FROM json_each(?))"
+        params = (task_store.ids_param(task_ids),)
+    return {row[0]: Rule.from_row(row[1:]) for row in conn.execute(query, params).fetchall()}
+
+# function for storing or clearing the rule of a task
+def save_rule(conn, task_id, rule):
+    if rule is None:
+        conn.execute("DELETE FROM task_rules WHERE task_id = ?", (task_id,))
+        return
+    conn.execute(f"INSERT OR REPLACE INTO task_rules (task_id, {RULE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                 (task_id, *rule.as_row()))
+
+# function for completing the current occurrence of a recurring task and moving the task
+# on to its next open occurrence, returning that date or None once the rule has ended;
+# only the touched occurrence is stored
+def complete_occurrence(conn, task_id, rule):
+    row = conn.execute("SELECT deadline FROM tasks WHERE id = ?", (task_id,)).fetchone()
+    try:
+        day = as_date(row[0])
+    except (TypeError, ValueError):
+        return None
+    
+    conn.execute("INSERT OR REPLACE INTO task_occurrences (task_id, day, status) VALUES (?, ?, 'Completed')",
+                 (task_id, day.strftime("%Y-%m-%d")))
+    done = {as_date(row[0]) for row in conn.execute(
+        "SELECT day FROM task_occurrences WHERE task_id = ? AND day > ? AND status = 'Completed'",
+        (task_id, day.strftime("%Y-%m-%d"))
+    ).fetchall()}
+    
+    next_day = rule.next_after(day, done)
+    if next_day is None:
+        conn.execute("UPDATE tasks SET status = 'Completed' WHERE id = ?", (task_id,))
+    else:
+        conn.execute("UPDATE tasks SET deadline = ?, status = 'Pending' WHERE id = ?",
+                     (next_day.strftime("%Y-%m-%d"), task_id))
+    return next_day
+
+# function for parsing the "ends" field of the form: empty, a YYYY-MM-DD date or a number of times,
+# returning (until, count)
+def parse_end(text):
+    text = text.strip()
+    if not text:
+        return None, None
+    if text.isdigit():
+        return None, int(text)
+    return as_date(text), None
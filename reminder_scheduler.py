@@ -0,0 +1,226 @@
+import collections
+import datetime
+import heapq
+import sqlite3
+import threading
+import time
+
+import recurrence
+import task_store
+
+# days ahead searched for the next reminder of a recurring task
+REMINDER_HORIZON_DAYS = 7
+# most reminders held between two deliveries to the UI, the oldest are dropped beyond it
+REMINDER_QUEUE_LIMIT = 1000
+# unfinished tasks with a reminder and a deadline from today on, or a recurrence rule, each
+# row ending with the rule columns; the parameter is today's date as YYYY-MM-DD
+REMINDER_SQL = (f"SELECT t.id, t.title, t.deadline, t.reminder_time, "
+                f"{', '.join('r.' + c for c in recurrence.RULE_COLUMNS.split(', '))} "
+                "FROM tasks t LEFT JOIN task_rules r ON r.task_id = t.id "
+                "WHERE t.reminder = 1 AND t.status != 'Completed' AND (t.deadline >= ? OR r.task_id IS NOT NULL)")
+
+# class for a bounded, thread-safe queue of fired reminders holding each task at most once
+class ReminderQueue:
+    # function for initializing an empty queue
+    def __init__(self, limit=REMINDER_QUEUE_LIMIT):
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.items = collections.OrderedDict()
+        self.dropped = 0
+    
+    # function for adding a reminder, replacing any queued one for the same task
+    def put(self, task_id, title):
+        with self.lock:
+            self.items.pop(task_id, None)
+            self.items[task_id] = title
+            if len(self.items) > self.limit:
+                self.items.popitem(last=False)
+                self.dropped += 1
+    
+    # function for taking every queued reminder, with the count dropped since the last drain
+    def drain(self):
+        with self.lock:
+            items, dropped = list(self.items.items()), self.dropped
+            self.items.clear()
+            self.dropped = 0
+        return items, dropped
+
+# function for the timestamp of the coming midnight, when every reminder is re-read
+def next_midnight():
+    tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+    return datetime.datetime.combine(tomorrow, datetime.time()).timestamp()
+
+# class for firing task reminders at their due time from a background thread
+class ReminderScheduler:
+    # function for initializing the scheduler, on_due is called with (task_id, title)
+    def __init__(self, on_due, db_path=task_store.DB_PATH):
+        self.on_due = on_due
+        self.db_path = db_path
+        self.condition = threading.Condition()
+        self.heap = []
+        self.entries = {}
+        self.fired = set()
+        self.recurring = set()
+        self.reload_at = next_midnight()
+        self.snoozed = {}
+        self.snooze_requests = {}
+        self.reload_all = True
+        self.changed_ids = set()
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+    
+    # function for starting the scheduler thread
+    def start(self):
+        self.thread.start()
+    
+    # function for stopping the scheduler thread
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+    
+    # function for waking the scheduler after tasks were added, edited or deleted,
+    # passing no task id re-reads every reminder
+    def notify(self, task_id=None):
+        with self.condition:
+            if task_id is None:
+                self.reload_all = True
+            else:
+                self.changed_ids.add(int(task_id))
+            self.condition.notify()
+    
+    # function for firing a task's reminder again after a delay in seconds
+    def snooze(self, task_id, title, delay):
+        with self.condition:
+            self.snooze_requests[int(task_id)] = (time.time() + delay, title)
+            self.condition.notify()
+    
+    # function for working out when a task's reminder is due
+    @staticmethod
+    def due_time(deadline, reminder_time):
+        try:
+            day = datetime.datetime.strptime(deadline, "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            return None
+        
+        try:
+            at = datetime.datetime.strptime(reminder_time, "%H:%M").time()
+        except (TypeError, ValueError):
+            at = datetime.time()
+        
+        return datetime.datetime.combine(day, at).timestamp()
+    
+    # function for working out when a recurring task's next unfired reminder within the
+    # horizon is due, generating only the occurrences in that window
+    def next_occurrence_due(self, task_id, deadline, reminder_time, rule):
+        today = datetime.date.today()
+        try:
+            first = max(recurrence.as_date(deadline), today)
+        except (TypeError, ValueError):
+            first = today
+        
+        for day in rule.occurrences(first, today + datetime.timedelta(days=REMINDER_HORIZON_DAYS)):
+            due = self.due_time(day.strftime("%Y-%m-%d"), reminder_time)
+            if (task_id, due) not in self.fired:
+                return due
+        return None
+    
+    # function for queueing the reminder of a single task row, which ends with the
+    # task's recurrence rule columns, all None for a one-off task
+    def schedule(self, task_id, title, deadline, reminder_time, *rule):
+        if rule and rule[0] is not None:
+            self.recurring.add(task_id)
+            due = self.next_occurrence_due(task_id, deadline, reminder_time, recurrence.Rule.from_row(rule))
+        else:
+            self.recurring.discard(task_id)
+            due = self.due_time(deadline, reminder_time)
+        
+        if due is None or (task_id, due) in self.fired:
+            self.entries.pop(task_id, None)
+            return
+        
+        self.entries[task_id] = due
+        heapq.heappush(self.heap, (due, task_id, title))
+    
+    # function for re-reading the reminders that changed since the last wakeup
+    def refresh(self, conn, reload_all, changed_ids):
+        today = datetime.date.today().strftime("%Y-%m-%d")
+        
+        if reload_all:
+            self.heap = []
+            self.entries = {}
+            self.recurring = set()
+            for task in conn.execute(REMINDER_SQL, (today,)):
+                self.schedule(*task)
+            for task_id, (due, title) in self.snoozed.items():
+                self.entries[task_id] = due
+                heapq.heappush(self.heap, (due, task_id, title))
+            return
+        
+        for task_id in changed_ids:
+            self.snoozed.pop(task_id, None)
+            self.entries.pop(task_id, None)
+            self.recurring.discard(task_id)
+            task = conn.execute(REMINDER_SQL + " AND t.id = ?", (today, task_id)).fetchone()
+            if task:
+                self.schedule(*task)
+    
+    # function for the scheduler loop, sleeping until the next reminder is due
+    def run(self):
+        conn = None
+        
+        while True:
+            with self.condition:
+                while (not self.stopped and not self.reload_all and not self.changed_ids
+                       and not self.snooze_requests):
+                    now = time.time()
+                    if now >= self.reload_at:
+                        self.reload_all = True
+                        self.reload_at = next_midnight()
+                        break
+                    
+                    timeout = min(self.heap[0][0], self.reload_at) - now if self.heap else self.reload_at - now
+                    if timeout <= 0:
+                        break
+                    self.condition.wait(timeout)
+                
+                if self.stopped:
+                    break
+                
+                reload_all, changed_ids = self.reload_all, self.changed_ids
+                self.reload_all, self.changed_ids = False, set()
+                snoozes, self.snooze_requests = self.snooze_requests, {}
+            
+            try:
+                if reload_all or changed_ids:
+                    if conn is None:
+                        conn = sqlite3.connect(self.db_path)
+                    self.refresh(conn, reload_all, changed_ids)
+                
+                for task_id, (due, title) in snoozes.items():
+                    self.snoozed[task_id] = (due, title)
+                    self.entries[task_id] = due
+                    heapq.heappush(self.heap, (due, task_id, title))
+                
+                now = time.time()
+                while self.heap and self.heap[0][0] <= now:
+                    due, task_id, title = heapq.heappop(self.heap)
+                    if self.entries.get(task_id) != due:
+                        continue
+                    
+                    del self.entries[task_id]
+                    self.snoozed.pop(task_id, None)
+                    self.fired.add((task_id, due))
+                    self.on_due(task_id, title)
+                    
+                    if task_id in self.recurring:
+                        with self.condition:
+                            self.changed_ids.add(task_id)
+            except Exception as e:
+                print(f"Error in reminder scheduler: {e}")
+                with self.condition:
+                    self.reload_all = True
+                    self.condition.wait(60)
+        
+        if conn is not None:
+            conn.close()
@@ -0,0 +1,324 @@
+import argparse
+import asyncio
+import concurrent.futures
+import datetime
+import json
+import sqlite3
+import sys
+import urllib.parse
+
+import task_io
+import task_store
+
+STATUSES = ("Pending", "In Progress", "Completed")
+# default and largest page size for GET /tasks
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# largest request body accepted, in bytes
+MAX_BODY = 1024 * 1024
+
+# class for an HTTP error answered with a JSON body
+class HTTPError(Exception):
+    # function for initializing the error with its status code and message
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+# class for a fixed set of SQLite connections shared by request handlers
+class ConnectionPool:
+    # function for opening the connections, all in WAL mode
+    def __init__(self, path, size, executor):
+        self.executor = executor
+        self.connections = asyncio.Queue()
+        for _ in range(size):
+            conn = task_store.connect(path, check_same_thread=False, isolation_level=None)
+            self.connections.put_nowait(conn)
+    
+    # function for running a blocking function with a pooled connection on the executor
+    async def run(self, function, *args):
+        conn = await self.connections.get()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, function, conn, *args)
+        finally:
+            self.connections.put_nowait(conn)
+    
+    # function for closing every connection
+    def close(self):
+        while not self.connections.empty():
+            self.connections.get_nowait().close()
+
+# function for turning a row into a JSON-friendly dict
+def task_dict(row):
+    return dict(zip(task_store.TASK_FIELDS, row))
+
+# function for running statements in a single write transaction, trimming the changelog the
+# desktop app reads as it goes
+def in_transaction(conn, function, *args):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        result = function(conn, *args)
+        task_store.prune_changes(conn)
+        conn.execute("COMMIT")
+        return result
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+# function for listing tasks one keyset page at a time
+def list_tasks(conn, query):
+    clauses, params = [], []
+    
+    try:
+        limit = min(int(query.get("limit", PAGE_SIZE)), MAX_PAGE_SIZE)
+        after = int(query.get("after", 0))
+        today = datetime.date.today()
+        where, filter_params = task_store.deadline_filter(query.get("deadline"), today)
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    if limit < 1:
+        raise HTTPError(400, "limit must be at least 1")
+    
+    clauses.append(where)
+    params.extend(filter_params)
+    if "status" in query:
+        clauses.append("status = ?")
+        params.append(query["status"])
+    if "reminder" in query:
+        clauses.append("reminder = ?")
+        params.append(1 if query["reminder"] in ("1", "true", "yes") else 0)
+    
+    rows = conn.execute(
+        f"SELECT {task_store.TASK_COLUMNS} FROM tasks WHERE {' AND '.join(clauses)} AND id > ? ORDER BY id LIMIT ?",
+        (*params, after, limit)
+    ).fetchall()
+    
+    tasks = [task_dict(row) for row in rows]
+    return {"tasks": tasks, "next_after": tasks[-1]["id"] if len(tasks) == limit else None}
+
+# function for reading one task
+def get_task(conn, task_id):
+    row = conn.execute(f"SELECT {task_store.TASK_COLUMNS} FROM tasks WHERE id = ?", (task_id,)).fetchone()
+    if row is None:
+        raise HTTPError(404, f"Task {task_id} not found")
+    return task_dict(row)
+
+# function for listing the unfinished tasks due today
+def due_today(conn):
+    today = task_store.epoch_day(datetime.date.today())
+    rows = conn.execute(
+        f"SELECT {task_store.TASK_COLUMNS} FROM tasks WHERE deadline_day = ? AND status != 'Completed' ORDER BY id",
+        (today,)
+    ).fetchall()
+    return {"tasks": [task_dict(row) for row in rows]}
+
+# function for checking a status value from a request
+def check_status(status):
+    if status not in STATUSES:
+        raise HTTPError(400, f"status must be one of {', '.join(STATUSES)}")
+    return status
+
+# function for checking a YYYY-MM-DD deadline from a request, empty meaning none
+def check_deadline(deadline):
+    if deadline and not task_store.valid_deadline(deadline):
+        raise HTTPError(400, "deadline must be YYYY-MM-DD")
+    return deadline
+
+# function for creating a task
+def create_task(conn, body):
+    if not isinstance(body.get("title"), str):
+        raise HTTPError(400, "title is required")
+    check_deadline(body.get("deadline"))
+    params = task_io.task_params(body)
+    if params is None:
+        raise HTTPError(400, "title is required")
+    check_status(params[3])
+    
+    cursor = conn.execute(task_io.INSERT_SQL, params)
+    return get_task(conn, cursor.lastrowid)
+
+# function for changing some fields of a task
+def update_task(conn, task_id, body):
+    fields = {name: body[name] for name in task_store.TASK_FIELDS[1:] if name in body}
+    if not fields:
+        raise HTTPError(400, f"nothing to update, expected any of {', '.join(task_store.TASK_FIELDS[1:])}")
+    if "title" in fields and not str(fields["title"]).strip():
+        raise HTTPError(400, "title cannot be empty")
+    if "status" in fields:
+        check_status(fields["status"])
+    if "deadline" in fields:
+        fields["deadline"] = check_deadline(fields["deadline"]) or None
+    if "reminder" in fields:
+        fields["reminder"] = 1 if fields["reminder"] in (1, True, "1", "true", "yes") else 0
+    
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    cursor = conn.execute(f"UPDATE tasks SET {assignments} WHERE id = ?", (*fields.values(), task_id))
+    if cursor.rowcount == 0:
+        raise HTTPError(404, f"Task {task_id} not found")
+    return get_task(conn, task_id)
+
+# function for setting the status of many tasks at once
+def bulk_status(conn, body):
+    status = check_status(body.get("status"))
+    ids = body.get("ids")
+    if not isinstance(ids, list) or not all(isinstance(task_id, int) for task_id in ids):
+        raise HTTPError(400, "ids must be a list of task ids")
+    
+    cursor = conn.executemany("UPDATE tasks SET status = ? WHERE id = ?", [(status, task_id) for task_id in ids])
+    return {"updated": cursor.rowcount}
+
+# function for deleting a task
+def delete_task(conn, task_id):
+    cursor = conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+    if cursor.rowcount == 0:
+        raise HTTPError(404, f"Task {task_id} not found")
+    return {"deleted": task_id}
+
+# class for the asyncio HTTP/JSON front end over the task store
+class TaskServer:
+    # function for initializing the server and its connection pools
+    def __init__(self, db_path=task_store.DB_PATH, readers=4):
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=readers + 1)
+        self.readers = ConnectionPool(db_path, readers, self.executor)
+        self.writer = ConnectionPool(db_path, 1, self.executor)
+    
+    # function for routing a request to its handler, returning the JSON-able response
+    async def dispatch(self, method, path, query, body):
+        parts = [part for part in path.split("/") if part]
+        
+        if parts == ["tasks"]:
+            if method == "GET":
+                return 200, await self.readers.run(list_tasks, query)
+            if method == "POST":
+                return 201, await self.writer.run(in_transaction, create_task, body)
+        elif parts == ["tasks", "due-today"] and method == "GET":
+            return 200, await self.readers.run(due_today)
+        elif parts == ["tasks", "bulk-status"] and method == "POST":
+            return 200, await self.writer.run(in_transaction, bulk_status, body)
+        elif len(parts) == 2 and parts[0] == "tasks" and parts[1].isdigit():
+            task_id = int(parts[1])
+            if method == "GET":
+                return 200, await self.readers.run(get_task, task_id)
+            if method in ("PATCH", "PUT"):
+                return 200, await self.writer.run(in_transaction, update_task, task_id, body)
+            if method == "DELETE":
+                return 200, await self.writer.run(in_transaction, delete_task, task_id)
+        else:
+            raise HTTPError(404, f"No route for {path}")
+        
+        raise HTTPError(405, f"{method} not allowed on {path}")
+    
+    # function for reading one request from a connection, None at end of stream
+    async def read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(400, "Content-Length must be a number")
+        if length < 0:
+            raise HTTPError(400, "Content-Length cannot be negative")
+        if length > MAX_BODY:
+            raise HTTPError(413, "Request body too large")
+        
+        body = None
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except ValueError:
+                raise HTTPError(400, "Body must be JSON")
+        
+        url = urllib.parse.urlsplit(target)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+        return method.upper(), url.path, query, body if isinstance(body, dict) else {}, keep_alive
+    
+    # function for serving one client connection, with keep-alive
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self.read_request(reader)
+                    if request is None:
+                        break
+                    method, path, query, body, keep_alive = request
+                    status, payload = await self.dispatch(method, path, query, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": e.message}
+                except sqlite3.Error as e:
+                    status, payload = 500, {"error": f"Database error: {e}"}
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    print(f"Error handling request: {e!r}", file=sys.stderr)
+                    status, payload, keep_alive = 500, {"error": "Internal server error"}, False
+                
+                data = json.dumps(payload).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    # function for serving until cancelled
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Serving tasks on http://{address[0]}:{address[1]}", file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+    
+    # function for closing the connection pools
+    def close(self):
+        self.readers.close()
+        self.writer.close()
+        self.executor.shutdown(wait=False)
+
+# function for the command line interface
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the to-do task store over local HTTP/JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default=task_store.DB_PATH, help="path to the task database")
+    parser.add_argument("--readers", type=int, default=4, help="pooled read connections")
+    args = parser.parse_args(argv)
+    
+    async def run():
+        await TaskServer(args.db, args.readers).serve(args.host, args.port)
+    
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import collections
+
+import task_store
+
+# rows fetched per chunk when the cache is filled from the database
+LOAD_CHUNK = 5000
+
+# class for a compact in-memory task record
+class Task:
+    __slots__ = task_store.TASK_FIELDS
+    
+    # function for initializing a task from its column values
+    def __init__(self, id, title, description, deadline, status, reminder, reminder_time):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.deadline = deadline
+        self.status = status
+        self.reminder = reminder
+        self.reminder_time = reminder_time
+    
+    # function for returning the task as a row in TASK_COLUMNS order
+    def as_row(self):
+        return (self.id, self.title, self.description, self.deadline,
+                self.status, self.reminder, self.reminder_time)
+
+# class for the authoritative in-memory copy of the tasks table, with a reverse
+# index by deadline for the midnight retag
+class TaskCache:
+    # function for initializing an empty cache
+    def __init__(self):
+        self.clear()
+    
+    # function for emptying the cache and its indexes
+    def clear(self):
+        self.tasks = {}
+        self.by_deadline = collections.defaultdict(set)
+    
+    # function for filling the cache from a cursor over SELECT <TASK_COLUMNS>
+    def load(self, cursor):
+        self.clear()
+        while True:
+            rows = cursor.fetchmany(LOAD_CHUNK)
+            if not rows:
+                break
+            for row in rows:
+                self.put(row)
+    
+    # function for adding a task to the deadline index
+    def index(self, task):
+        self.by_deadline[task.deadline].add(task.id)
+    
+    # function for removing a task from the deadline index
+    def unindex(self, task):
+        self.by_deadline[task.deadline].discard(task.id)
+        if not self.by_deadline[task.deadline]:
+            del self.by_deadline[task.deadline]
+    
+    # function for inserting or replacing a task from a row in TASK_COLUMNS order
+    def put(self, row):
+        task = Task(*row)
+        old = self.tasks.get(task.id)
+        if old is not None:
+            self.unindex(old)
+        
+        self.tasks[task.id] = task
+        self.index(task)
+        return task
+    
+    # function for changing some fields of a cached task
+    def update(self, task_id, **fields):
+        task = self.tasks.get(int(task_id))
+        if task is None:
+            return None
+        
+        self.unindex(task)
+        for name, value in fields.items():
+            setattr(task, name, value)
+        self.index(task)
+        return task
+    
+    # function for dropping a task from the cache
+    def remove(self, task_id):
+        task = self.tasks.pop(int(task_id), None)
+        if task is not None:
+            self.unindex(task)
+        return task
+    
+    # function for looking up a task by id
+    def get(self, task_id):
+        return self.tasks.get(int(task_id))
+    
+    # function for counting the cached tasks
+    def __len__(self):
+        return len(self.tasks)
@@ -0,0 +1,170 @@
+import argparse
+import csv
+import itertools
+import json
+import sqlite3
+import sys
+
+import task_store
+
+EXPORT_FIELDS = task_store.TASK_FIELDS
+# rows inserted per executemany call and fetched per fetchmany call
+CHUNK_SIZE = 5000
+
+INSERT_SQL = (
+    "INSERT INTO tasks (title, description, deadline, status, reminder, reminder_time) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+FTS_FILL_SQL = "INSERT INTO tasks_fts (rowid, title, description) SELECT id, title, description FROM tasks WHERE id > ?"
+
+# function for picking the file format from a file name
+def file_format(path):
+    if path.lower().endswith(".csv"):
+        return "csv"
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        return "ndjson"
+    raise ValueError(f"Unsupported file type: {path} (use .csv, .jsonl or .ndjson)")
+
+# function for streaming task records out of a CSV file
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+# function for streaming task records out of a JSON Lines file
+def read_ndjson(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+# function for turning an imported record into insert parameters, None when it has no title
+def task_params(record):
+    title = (record.get("title") or "").strip()
+    if not title:
+        return None
+    
+    # a time of day after the date is dropped, anything else that is not YYYY-MM-DD is refused
+    deadline = str(record.get("deadline") or "").strip()
+    if deadline[10:11] in (" ", "T"):
+        deadline = deadline[:10]
+    if deadline and not task_store.valid_deadline(deadline):
+        raise ValueError(f"Invalid deadline {deadline!r} for task {title!r}, expected YYYY-MM-DD")
+    
+    reminder = record.get("reminder")
+    if isinstance(reminder, str):
+        reminder = reminder.strip().lower() in ("1", "yes", "true")
+    
+    return (
+        title,
+        record.get("description") or "",
+        deadline or None,
+        record.get("status") or "Pending",
+        1 if reminder else 0,
+        record.get("reminder_time") or None,
+    )
+
+# function for reading a file as a stream of insert parameters
+def read_tasks(path):
+    records = read_csv(path) if file_format(path) == "csv" else read_ndjson(path)
+    for record in records:
+        params = task_params(record)
+        if params is not None:
+            yield params
+
+# function for inserting a stream of tasks in chunks, inside the caller's transaction; the
+# search index is filled with one statement at the end instead of a trigger per row
+def insert_tasks(cursor, tasks, chunk_size=CHUNK_SIZE, progress=None):
+    count = 0
+    tasks = iter(tasks)
+    first_id = cursor.execute("SELECT IFNULL(MAX(id), 0) FROM tasks").fetchone()[0]
+    cursor.execute("INSERT OR IGNORE INTO fts_deferred (id) VALUES (0)")
+    
+    while True:
+        chunk = list(itertools.islice(tasks, chunk_size))
+        if not chunk:
+            break
+        
+        cursor.executemany(INSERT_SQL, chunk)
+        count += len(chunk)
+        if progress is not None:
+            progress(count)
+    
+    cursor.execute("DELETE FROM fts_deferred")
+    cursor.execute(FTS_FILL_SQL, (first_id,))
+    return count
+
+# function for streaming every task out of the database in chunks
+def iter_tasks(conn, chunk_size=CHUNK_SIZE):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {', '.join(EXPORT_FIELDS)} FROM tasks ORDER BY id")
+    
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield from rows
+
+# function for writing every task to a CSV or JSON Lines file
+def export_tasks(conn, path, chunk_size=CHUNK_SIZE, progress=None):
+    fmt = file_format(path)
+    count = 0
+    
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_FIELDS)
+        
+        for row in iter_tasks(conn, chunk_size):
+            if fmt == "csv":
+                writer.writerow(row)
+            else:
+                f.write(json.dumps(dict(zip(EXPORT_FIELDS, row))) + "\n")
+            
+            count += 1
+            if progress is not None and count % chunk_size == 0:
+                progress(count)
+    
+    return count
+
+# function for importing a file into the database in a single transaction
+def import_file(conn, path, chunk_size=CHUNK_SIZE, progress=None):
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        count = insert_tasks(cursor, read_tasks(path), chunk_size, progress)
+        task_store.prune_changes(conn)
+        cursor.execute("COMMIT")
+    except BaseException:
+        conn.rollback()
+        raise
+    return count
+
+# function for the command line interface
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import or export to-do tasks as CSV or JSON Lines")
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("file", help="a .csv, .jsonl or .ndjson file")
+    parser.add_argument("--db", default=task_store.DB_PATH, help="path to the task database")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+    
+    def progress(count):
+        print(f"\r{args.command.capitalize()}ed {count} tasks...", end="", file=sys.stderr)
+    
+    try:
+        file_format(args.file)
+        conn = task_store.connect(args.db, isolation_level=None)
+        if args.command == "import":
+            count = import_file(conn, args.file, args.chunk_size, progress)
+        else:
+            count = export_tasks(conn, args.file, args.chunk_size, progress)
+        conn.close()
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    
+    print(f"\r{args.command.capitalize()}ed {count} tasks", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
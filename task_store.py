@@ -0,0 +1,557 @@
+import datetime
+import functools
+import json
+import os
+import sqlite3
+
+DB_PATH = "to-do.db"
+# PRAGMA synchronous level for connections, one of OFF, NORMAL, FULL or EXTRA
+SYNCHRONOUS = os.environ.get("TODO_DB_SYNCHRONOUS", "NORMAL").upper()
+SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+# each entry upgrades the schema by one version, tracked in PRAGMA user_version
+MIGRATIONS = [
+    # 1: the original tasks table
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            deadline TEXT,
+            status TEXT DEFAULT 'Pending',
+            reminder INTEGER DEFAULT 0
+        )
+        ''',
+    ],
+    # 2: partial covering indexes for the due-today and reminder scans
+    [
+        '''
+        CREATE INDEX IF NOT EXISTS idx_tasks_open_deadline
+        ON tasks (deadline, status, title) WHERE status != 'Completed'
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_tasks_reminder_deadline
+        ON tasks (deadline, status, reminder, title) WHERE reminder = 1 AND status != 'Completed'
+        ''',
+    ],
+    # 3: optional time of day (HH:MM) for reminders
+    [
+        "ALTER TABLE tasks ADD COLUMN reminder_time TEXT",
+        "DROP INDEX IF EXISTS idx_tasks_reminder_deadline",
+        '''
+        CREATE INDEX idx_tasks_reminder_deadline
+        ON tasks (deadline, status, reminder, title, reminder_time)
+        WHERE reminder = 1 AND status != 'Completed'
+        ''',
+    ],
+    # 4: full-text index over title and description, kept in sync by triggers
+    [
+        '''
+        CREATE VIRTUAL TABLE tasks_fts USING fts5(
+            title, description, content='tasks', content_rowid='id'
+        )
+        ''',
+        '''
+        CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+        ''',
+        '''
+        CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+        ''',
+        '''
+        CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO tasks_fts (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+        ''',
+        "INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')",
+    ],
+    # 5: deadlines as indexed integer days since 1970-01-01, NULL when missing or malformed
+    [
+        "ALTER TABLE tasks ADD COLUMN deadline_day INTEGER",
+        "UPDATE tasks SET deadline_day = CAST(julianday(deadline) - 2440587.5 AS INTEGER)",
+        "CREATE INDEX idx_tasks_deadline_day ON tasks (deadline_day, status)",
+        '''
+        CREATE TRIGGER tasks_deadline_day_insert AFTER INSERT ON tasks BEGIN
+            UPDATE tasks SET deadline_day = CAST(julianday(new.deadline) - 2440587.5 AS INTEGER)
+            WHERE id = new.id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER tasks_deadline_day_update AFTER UPDATE OF deadline ON tasks BEGIN
+            UPDATE tasks SET deadline_day = CAST(julianday(new.deadline) - 2440587.5 AS INTEGER)
+            WHERE id = new.id;
+        END
+        ''',
+    ],
+    # 6: indexes for sorting the list by (column, id)
+    [
+        "CREATE INDEX idx_tasks_title ON tasks (title)",
+        "CREATE INDEX idx_tasks_status ON tasks (status)",
+        "CREATE INDEX idx_tasks_reminder ON tasks (reminder)",
+        "CREATE INDEX idx_tasks_deadline_day_sort ON tasks (deadline_day)",
+    ],
+    # 7: changelog of task writes so other connections can patch only what changed
+    [
+        '''
+        CREATE TABLE task_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER NOT NULL,
+            op TEXT NOT NULL
+        )
+        ''',
+        '''
+        CREATE TRIGGER tasks_changes_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO task_changes (task_id, op) VALUES (new.id, 'insert');
+        END
+        ''',
+        '''
+        CREATE TRIGGER tasks_changes_update
+        AFTER UPDATE OF title, description, deadline, status, reminder, reminder_time ON tasks BEGIN
+            INSERT INTO task_changes (task_id, op) VALUES (new.id, 'update');
+        END
+        ''',
+        '''
+        CREATE TRIGGER tasks_changes_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO task_changes (task_id, op) VALUES (old.id, 'delete');
+        END
+        ''',
+    ],
+    # 8: completion dates and a cold archive table for old completed tasks
+    [
+        "ALTER TABLE tasks ADD COLUMN completed_at TEXT",
+        '''
+        UPDATE tasks SET completed_at = CASE
+            WHEN julianday(deadline) < julianday('now', 'localtime') THEN date(deadline)
+            ELSE date('now', 'localtime')
+        END
+        WHERE status = 'Completed'
+        ''',
+        "CREATE INDEX idx_tasks_completed_at ON tasks (completed_at) WHERE status = 'Completed'",
+        '''
+        CREATE TRIGGER tasks_completed_at_insert AFTER INSERT ON tasks
+        WHEN new.status = 'Completed' AND new.completed_at IS NULL BEGIN
+            UPDATE tasks SET completed_at = date('now', 'localtime') WHERE id = new.id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER tasks_completed_at_update AFTER UPDATE OF status ON tasks
+        WHEN new.status IS NOT old.status BEGIN
+            UPDATE tasks SET completed_at = CASE WHEN new.status = 'Completed' THEN date('now', 'localtime') END
+            WHERE id = new.id;
+        END
+        ''',
+        '''
+        CREATE TABLE tasks_archive (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT,
+            deadline TEXT,
+            status TEXT,
+            reminder INTEGER,
+            reminder_time TEXT,
+            deadline_day INTEGER,
+            completed_at TEXT,
+            archived_at TEXT
+        )
+        ''',
+        "CREATE INDEX idx_tasks_archive_title ON tasks_archive (title)",
+        "CREATE INDEX idx_tasks_archive_deadline_day ON tasks_archive (deadline_day)",
+        '''
+        CREATE VIEW tasks_with_archive AS
+        SELECT id, title, description, deadline, status, reminder, reminder_time, deadline_day, 0 AS archived
+        FROM tasks
+        UNION ALL
+        SELECT id, title, description, deadline, status, reminder, reminder_time, deadline_day, 1 AS archived
+        FROM tasks_archive
+        ''',
+    ],
+    # 9: recurrence rules, and the occurrences of recurring tasks that were acted on
+    [
+        '''
+        CREATE TABLE task_rules (
+            task_id INTEGER PRIMARY KEY,
+            frequency TEXT NOT NULL,
+            start TEXT NOT NULL,
+            interval INTEGER NOT NULL DEFAULT 1,
+            until TEXT,
+            count INTEGER
+        )
+        ''',
+        '''
+        CREATE TABLE task_occurrences (
+            task_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            status TEXT NOT NULL,
+            PRIMARY KEY (task_id, day)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TRIGGER tasks_rules_delete AFTER DELETE ON tasks BEGIN
+            DELETE FROM task_rules WHERE task_id = old.id;
+            DELETE FROM task_occurrences WHERE task_id = old.id;
+        END
+        ''',
+    ],
+    # 10: trigger-maintained task counters for the status bar in a single row; the date
+    # buckets count against the epoch day in 'today' and are recounted when the date rolls over
+    [
+        '''
+        CREATE TABLE task_counts (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            today INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            pending INTEGER NOT NULL,
+            in_progress INTEGER NOT NULL,
+            completed INTEGER NOT NULL,
+            reminders INTEGER NOT NULL,
+            due_today INTEGER NOT NULL,
+            overdue INTEGER NOT NULL
+        )
+        ''',
+        '''
+        INSERT INTO task_counts
+        SELECT 0, today, COUNT(tasks.id),
+            TOTAL(status IS 'Pending'),
+            TOTAL(status IS 'In Progress'),
+            TOTAL(status IS 'Completed'),
+            TOTAL(reminder IS 1 AND status IS NOT 'Completed'),
+            TOTAL(status IS NOT 'Completed' AND deadline_day IS today),
+            TOTAL(status IS NOT 'Completed' AND IFNULL(deadline_day < today, 0))
+        FROM (SELECT CAST(julianday('now', 'localtime') - 2440587.5 AS INTEGER) AS today)
+        LEFT JOIN tasks
+        ''',
+        '''
+        CREATE TRIGGER tasks_counts_insert AFTER INSERT ON tasks BEGIN
+            UPDATE task_counts SET
+                total = total + 1,
+                pending = pending + (new.status IS 'Pending'),
+                in_progress = in_progress + (new.status IS 'In Progress'),
+                completed = completed + (new.status IS 'Completed'),
+                reminders = reminders + (new.reminder IS 1 AND new.status IS NOT 'Completed'),
+                due_today = due_today + (new.status IS NOT 'Completed' AND new.deadline_day IS today),
+                overdue = overdue + (new.status IS NOT 'Completed' AND IFNULL(new.deadline_day < today, 0));
+        END
+        ''',
+        '''
+        CREATE TRIGGER tasks_counts_delete AFTER DELETE ON tasks BEGIN
+            UPDATE task_counts SET
+                total = total - 1,
+                pending = pending - (old.status IS 'Pending'),
+                in_progress = in_progress - (old.status IS 'In Progress'),
+                completed = completed - (old.status IS 'Completed'),
+                reminders = reminders - (old.reminder IS 1 AND old.status IS NOT 'Completed'),
+                due_today = due_today - (old.status IS NOT 'Completed' AND old.deadline_day IS today),
+                overdue = overdue - (old.status IS NOT 'Completed' AND IFNULL(old.deadline_day < today, 0));
+        END
+        ''',
+        '''
+        CREATE TRIGGER tasks_counts_update AFTER UPDATE OF status, reminder, deadline_day ON tasks BEGIN
+            UPDATE task_counts SET
+                pending = pending + (new.status IS 'Pending') - (old.status IS 'Pending'),
+                in_progress = in_progress + (new.status IS 'In Progress') - (old.status IS 'In Progress'),
+                completed = completed + (new.status IS 'Completed') - (old.status IS 'Completed'),
+                reminders = reminders + (new.reminder IS 1 AND new.status IS NOT 'Completed')
+                    - (old.reminder IS 1 AND old.status IS NOT 'Completed'),
+                due_today = due_today + (new.status IS NOT 'Completed' AND new.deadline_day IS today)
+                    - (old.status IS NOT 'Completed' AND old.deadline_day IS today),
+                overdue = overdue + (new.status IS NOT 'Completed' AND IFNULL(new.deadline_day < today, 0))
+                    - (old.status IS NOT 'Completed' AND IFNULL(old.deadline_day < today, 0));
+        END
+        ''',
+    ],
+    # 11: when each background maintenance job last finished, how long it took and its result
+    [
+        '''
+        CREATE TABLE maintenance_runs (
+            job TEXT PRIMARY KEY,
+            finished_at REAL NOT NULL,
+            seconds REAL NOT NULL,
+            result TEXT
+        )
+        ''',
+    ],
+    # 12: a missing deadline is stored as NULL, never as an empty string
+    [
+        "UPDATE tasks SET deadline = NULL WHERE deadline = ''",
+        "UPDATE tasks_archive SET deadline = NULL WHERE deadline = ''",
+    ],
+    # 13: bulk loads set a row in fts_deferred to skip the per-row index insert, then fill the
+    # search index with one statement once the rows are in
+    [
+        "CREATE TABLE fts_deferred (id INTEGER PRIMARY KEY CHECK (id = 0))",
+        "DROP TRIGGER tasks_fts_insert",
+        """
+        CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks
+        WHEN NOT EXISTS (SELECT 1 FROM fts_deferred) BEGIN
+            INSERT INTO tasks_fts (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+        """,
+    ],
+    # 14: only a real date in the strict YYYY-MM-DD form gets a deadline_day, a time of day after
+    # the date is dropped, and the unused partial deadline index goes; date() only rolls an
+    # impossible day such as 02-30 over once it is given a modifier
+    [
+        "DROP TRIGGER tasks_deadline_day_insert",
+        "DROP TRIGGER tasks_deadline_day_update",
+        '''
+        CREATE TRIGGER tasks_deadline_day_insert AFTER INSERT ON tasks BEGIN
+            UPDATE tasks SET deadline_day = CASE WHEN date(new.deadline, '+0 days') = new.deadline
+                THEN CAST(julianday(new.deadline) - 2440587.5 AS INTEGER) END
+            WHERE id = new.id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER tasks_deadline_day_update AFTER UPDATE OF deadline ON tasks BEGIN
+            UPDATE tasks SET deadline_day = CASE WHEN date(new.deadline, '+0 days') = new.deadline
+                THEN CAST(julianday(new.deadline) - 2440587.5 AS INTEGER) END
+            WHERE id = new.id;
+        END
+        ''',
+        '''
+        UPDATE tasks SET deadline = substr(deadline, 1, 10)
+        WHERE substr(deadline, 11, 1) IN (' ', 'T')
+            AND date(substr(deadline, 1, 10), '+0 days') = substr(deadline, 1, 10)
+        ''',
+        '''
+        UPDATE tasks_archive SET deadline = substr(deadline, 1, 10)
+        WHERE substr(deadline, 11, 1) IN (' ', 'T')
+            AND date(substr(deadline, 1, 10), '+0 days') = substr(deadline, 1, 10)
+        ''',
+        '''
+        UPDATE tasks SET deadline_day = CASE WHEN date(deadline, '+0 days') = deadline
+            THEN CAST(julianday(deadline) - 2440587.5 AS INTEGER) END
+        WHERE deadline_day IS NOT CASE WHEN date(deadline, '+0 days') = deadline
+            THEN CAST(julianday(deadline) - 2440587.5 AS INTEGER) END
+        ''',
+        '''
+        UPDATE tasks_archive SET deadline_day = CASE WHEN date(deadline, '+0 days') = deadline
+            THEN CAST(julianday(deadline) - 2440587.5 AS INTEGER) END
+        WHERE deadline_day IS NOT CASE WHEN date(deadline, '+0 days') = deadline
+            THEN CAST(julianday(deadline) - 2440587.5 AS INTEGER) END
+        ''',
+        "DROP INDEX IF EXISTS idx_tasks_open_deadline",
+    ],
+]
+
+EPOCH = datetime.date(1970, 1, 1)
+
+# days a task stays completed before it is moved to the archive
+ARCHIVE_AFTER_DAYS = int(os.environ.get("TODO_ARCHIVE_AFTER_DAYS", "30"))
+# tasks moved to or from the archive per transaction
+ARCHIVE_BATCH = 1000
+# columns of a task row as the app, the server and import and export read it
+TASK_FIELDS = ("id", "title", "description", "deadline", "status", "reminder", "reminder_time")
+TASK_COLUMNS = ", ".join(TASK_FIELDS)
+# columns copied between tasks and tasks_archive
+ARCHIVE_COLUMNS = f"{TASK_COLUMNS}, deadline_day, completed_at"
+
+# shortest search term matched as a prefix
+FTS_MIN_PREFIX = 3
+
+# changelog rows kept behind the newest one when the changelog is pruned
+CHANGELOG_KEEP = 10000
+
+# named deadline windows for the list filter
+DEADLINE_FILTERS = ("today", "week", "overdue", "overdue_week", "none")
+
+# SQL expression classifying a row into its list tag, ?1 is bound to today's epoch day
+TAG_SQL = """CASE
+    WHEN status IS NOT 'Completed' AND deadline_day = ?1 THEN 'duetoday'
+    WHEN status IS NOT 'Completed' AND deadline_day < ?1 THEN 'overdue'
+    WHEN status = 'Completed' THEN 'completed'
+    WHEN status = 'In Progress' THEN 'inprogress'
+    ELSE 'pending'
+END"""
+
+# function for classifying a task into its list tag, the Python twin of TAG_SQL,
+# both days being epoch days
+def task_tag(status, deadline_day, today):
+    if status != "Completed" and deadline_day is not None:
+        if deadline_day == today:
+            return "duetoday"
+        if deadline_day < today:
+            return "overdue"
+    
+    if status == "Completed":
+        return "completed"
+    if status == "In Progress":
+        return "inprogress"
+    return "pending"
+
+# function for converting a date to the deadline_day number stored in the database
+def epoch_day(date):
+    return (date - EPOCH).days
+
+# function for checking that a deadline is a real date in the strict YYYY-MM-DD form,
+# the only form the deadline_day triggers give a day to
+def valid_deadline(deadline):
+    try:
+        return datetime.date.fromisoformat(deadline).isoformat() == deadline
+    except (TypeError, ValueError):
+        return False
+
+# function for converting a deadline to its deadline_day, None when missing or malformed,
+# the Python twin of the deadline_day triggers
+@functools.lru_cache(maxsize=4096)
+def deadline_day(deadline):
+    if not valid_deadline(deadline):
+        return None
+    return epoch_day(datetime.date.fromisoformat(deadline))
+
+# function for building the WHERE clause and parameters of a named deadline window
+def deadline_filter(name, today):
+    day = epoch_day(today)
+    
+    if name == "today":
+        return "deadline_day = ?", (day,)
+    if name == "week":
+        monday = day - today.weekday()
+        return "deadline_day BETWEEN ? AND ?", (monday, monday + 6)
+    if name == "overdue":
+        return "deadline_day < ? AND status != 'Completed'", (day,)
+    if name == "overdue_week":
+        return "deadline_day < ? AND status != 'Completed'", (day - 7,)
+    if name == "none":
+        return "deadline_day IS NULL", ()
+    if name is None:
+        return "1 = 1", ()
+    raise ValueError(f"Unknown deadline filter: {name}")
+
+# SQL condition matching the task ids bound as one JSON array parameter, see ids_param
+IDS_SQL = "id IN (SELECT value FROM json_each(?))"
+
+# function for binding any number of task ids as the single parameter of IDS_SQL
+def ids_param(task_ids):
+    return json.dumps([int(task_id) for task_id in task_ids])
+
+# function for reading the sequence number of the newest recorded task change
+def latest_change(conn):
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'task_changes'").fetchone()
+    return row[0] if row else 0
+
+# function for reading the ids of the tasks changed after a sequence number, with the
+# newest sequence number; the ids are None when the changelog was pruned past that point or
+# holds more than limit changes, and the caller should reload everything instead
+def changes_since(conn, seq, limit):
+    rows = conn.execute("SELECT seq, task_id FROM task_changes WHERE seq > ? ORDER BY seq LIMIT ?",
+                        (seq, limit + 1)).fetchall()
+    if not rows:
+        return set(), seq
+    if rows[0][0] > seq + 1 or len(rows) > limit:
+        return None, latest_change(conn)
+    return {row[1] for row in rows}, rows[-1][0]
+
+# function for dropping all but the newest changelog rows
+def prune_changes(conn, keep=CHANGELOG_KEEP):
+    conn.execute(
+        "DELETE FROM task_changes WHERE seq <= (SELECT seq FROM sqlite_sequence WHERE name = 'task_changes') - ?",
+        (keep,)
+    )
+
+# function for moving one batch of tasks completed before a date into the archive,
+# returning the ids moved; run it inside a write transaction
+def archive_completed(conn, before, limit=ARCHIVE_BATCH):
+    task_ids = [row[0] for row in conn.execute(
+        "SELECT id FROM tasks WHERE status = 'Completed' AND completed_at < ? ORDER BY completed_at LIMIT ?",
+        (before.strftime("%Y-%m-%d"), limit)
+    ).fetchall()]
+    
+    if task_ids:
+        ids = ids_param(task_ids)
+        conn.execute(
+            f"INSERT OR REPLACE INTO tasks_archive ({ARCHIVE_COLUMNS}, archived_at) "
+            f"SELECT {ARCHIVE_COLUMNS}, date('now', 'localtime') FROM tasks WHERE {IDS_SQL}",
+            (ids,)
+        )
+        conn.execute(f"DELETE FROM tasks WHERE {IDS_SQL}", (ids,))
+    return task_ids
+
+# function for moving archived tasks back into the tasks table, returning the ids moved;
+# their completion date restarts so they are not archived again straight away
+def restore_archived(conn, task_ids):
+    ids = ids_param(task_ids)
+    restored = [row[0] for row in conn.execute(
+        f"SELECT id FROM tasks_archive WHERE {IDS_SQL}", (ids,)
+    ).fetchall()]
+    
+    if restored:
+        columns = ARCHIVE_COLUMNS.replace(", completed_at", "")
+        conn.execute(
+            f"INSERT INTO tasks ({ARCHIVE_COLUMNS}) "
+            f"SELECT {columns}, CASE WHEN status = 'Completed' THEN date('now', 'localtime') END "
+            f"FROM tasks_archive WHERE {IDS_SQL}",
+            (ids,)
+        )
+        conn.execute(f"DELETE FROM tasks_archive WHERE {IDS_SQL}", (ids,))
+    return restored
+
+# function for reading the trigger-maintained task counters as a dict, a single-row read
+def read_counts(conn):
+    cursor = conn.execute("SELECT * FROM task_counts")
+    return dict(zip((column[0] for column in cursor.description), cursor.fetchone()))
+
+# function for recounting the date buckets of the task counters against a new today,
+# run once per day inside a write transaction
+def roll_counts(conn, today):
+    day = epoch_day(today)
+    conn.execute(
+        "UPDATE task_counts SET today = ?1, "
+        "due_today = (SELECT COUNT(*) FROM tasks WHERE status IS NOT 'Completed' AND deadline_day = ?1), "
+        "overdue = (SELECT COUNT(*) FROM tasks WHERE status IS NOT 'Completed' AND deadline_day < ?1)",
+        (day,)
+    )
+
+# function for turning typed search text into an FTS5 prefix query, terms shorter than
+# FTS_MIN_PREFIX matching whole words only since their prefixes match most of the table
+def fts_query(text):
+    terms = [term.replace('"', '""') for term in text.split()]
+    return " ".join(f'"{term}"*' if len(term) >= FTS_MIN_PREFIX else f'"{term}"' for term in terms)
+
+# function for opening a connection to the task database with the schema up to date
+def connect(path=DB_PATH, synchronous=SYNCHRONOUS, **kwargs):
+    if synchronous not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f"synchronous must be one of {', '.join(SYNCHRONOUS_LEVELS)}")
+    
+    conn = sqlite3.connect(path, **kwargs)
+    # only applies to a new file, existing ones are converted by the maintenance scheduler
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(f"PRAGMA synchronous = {synchronous}")
+    migrate(conn)
+    return conn
+
+# function for applying any pending schema migrations in place; the version is read again
+# under the write lock, so a second process starting at the same time applies nothing twice
+def migrate(conn):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= len(MIGRATIONS):
+        return version
+    
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= len(MIGRATIONS):
+            conn.rollback()
+            return version
+        for statements in MIGRATIONS[version:]:
+            for statement in statements:
+                conn.execute(statement)
+        conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    
+    conn.execute("ANALYZE")
+    conn.commit()
+    return len(MIGRATIONS)
@@ -0,0 +1,53 @@
+import datetime
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recurrence import Rule, parse_end
+
+D = datetime.date
+
+# class for checking occurrence generation at month ends, leap days and window edges
+class RuleTest(unittest.TestCase):
+    # function for checking that a monthly rule from the 31st falls on each month's last day
+    # without drifting to the shorter months' day
+    def test_monthly_month_end(self):
+        rule = Rule("monthly", "2024-01-31", count=5)
+        self.assertEqual(list(rule.occurrences()),
+                         [D(2024, 1, 31), D(2024, 2, 29), D(2024, 3, 31), D(2024, 4, 30), D(2024, 5, 31)])
+    
+    # function for checking a leap day start repeats on February 28 and again on the next leap day
+    def test_leap_day(self):
+        rule = Rule("monthly", "2024-02-29", interval=12)
+        self.assertEqual(list(rule.occurrences(window_end=D(2028, 12, 31))),
+                         [D(2024, 2, 29), D(2025, 2, 28), D(2026, 2, 28), D(2027, 2, 28), D(2028, 2, 29)])
+    
+    # function for checking that a window starting mid-rule neither skips nor repeats occurrences
+    def test_window(self):
+        rule = Rule("monthly", "2024-01-31")
+        self.assertEqual(list(rule.occurrences(D(2024, 3, 15), D(2024, 6, 30))),
+                         [D(2024, 3, 31), D(2024, 4, 30), D(2024, 5, 31), D(2024, 6, 30)])
+        self.assertEqual(list(rule.occurrences(D(2024, 4, 30), D(2024, 4, 30))), [D(2024, 4, 30)])
+        
+        weekly = Rule("weekly", "2024-02-26", interval=2)
+        self.assertEqual(list(weekly.occurrences(D(2024, 3, 11), D(2024, 3, 25))), [D(2024, 3, 11), D(2024, 3, 25)])
+    
+    # function for checking the until and count end conditions
+    def test_end_conditions(self):
+        self.assertEqual(list(Rule("daily", "2024-02-27", until="2024-03-01").occurrences()),
+                         [D(2024, 2, 27), D(2024, 2, 28), D(2024, 2, 29), D(2024, 3, 1)])
+        self.assertEqual(list(Rule("monthly", "2024-01-31", count=2).occurrences(D(2024, 3, 1))), [])
+        self.assertEqual(parse_end("3"), (None, 3))
+        self.assertEqual(parse_end("2024-03-01"), (D(2024, 3, 1), None))
+    
+    # function for checking the next occurrence skips dates already completed
+    def test_next_after(self):
+        rule = Rule("monthly", "2024-01-31", count=3)
+        self.assertEqual(rule.next_after(D(2024, 1, 31)), D(2024, 2, 29))
+        self.assertEqual(rule.next_after(D(2024, 1, 31), {D(2024, 2, 29)}), D(2024, 3, 31))
+        self.assertIsNone(rule.next_after(D(2024, 3, 31)))
+
+if __name__ == "__main__":
+    unittest.main()
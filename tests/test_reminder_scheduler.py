@@ -0,0 +1,102 @@
+import datetime
+import heapq
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import task_io
+import task_store
+from reminder_scheduler import ReminderScheduler
+
+# seconds a test waits for a reminder to fire before failing
+WAIT = 5
+
+# class for checking the order reminders are queued and fired in, and how snoozes survive refreshes
+class ReminderSchedulerTest(unittest.TestCase):
+    # function for creating a database and a scheduler that records every fired reminder
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "tasks.db")
+        self.conn = task_store.connect(self.path, isolation_level=None)
+        self.today = datetime.date.today()
+        self.fired = []
+        self.fired_event = threading.Event()
+        self.scheduler = ReminderScheduler(self.on_due, self.path)
+    
+    # function for stopping the scheduler and removing the database
+    def tearDown(self):
+        self.scheduler.stop()
+        if self.scheduler.thread.is_alive():
+            self.scheduler.thread.join(WAIT)
+        self.conn.close()
+        self.directory.cleanup()
+    
+    # function for recording a fired reminder
+    def on_due(self, task_id, title):
+        self.fired.append(title)
+        self.fired_event.set()
+    
+    # function for waiting until a number of reminders have fired
+    def wait_for(self, count):
+        while len(self.fired) < count:
+            self.assertTrue(self.fired_event.wait(WAIT), f"only {self.fired} fired")
+            self.fired_event.clear()
+    
+    # function for formatting a date a number of days from today
+    def day(self, offset):
+        return (self.today + datetime.timedelta(days=offset)).strftime("%Y-%m-%d")
+    
+    # function for adding a task with a reminder, returning its id
+    def add(self, title, offset, reminder_time):
+        return self.conn.execute(task_io.INSERT_SQL,
+                                 (title, "", self.day(offset), "Pending", 1, reminder_time)).lastrowid
+    
+    # function for checking that a full refresh queues every reminder in due order
+    # and a changed task replaces only its own entry
+    def test_refresh_orders_by_due_time(self):
+        later = self.add("later", 2, "08:00")
+        self.add("soonest", 1, "07:30")
+        self.add("middle", 1, "09:00")
+        self.add("no reminder time", 3, None)
+        
+        self.scheduler.refresh(self.conn, True, set())
+        order = [heapq.heappop(self.scheduler.heap)[2] for _ in range(len(self.scheduler.heap))]
+        self.assertEqual(order, ["soonest", "middle", "later", "no reminder time"])
+        
+        self.scheduler.refresh(self.conn, True, set())
+        self.conn.execute("UPDATE tasks SET reminder_time = '06:00' WHERE id = ?", (later,))
+        self.scheduler.refresh(self.conn, False, {later})
+        live = sorted((due, title) for due, task_id, title in self.scheduler.heap
+                      if self.scheduler.entries.get(task_id) == due)
+        self.assertEqual([title for _, title in live], ["soonest", "middle", "later", "no reminder time"])
+        self.assertEqual(self.scheduler.entries[later], ReminderScheduler.due_time(self.day(2), "06:00"))
+    
+    # function for checking that reminders already due fire in due order, and that a snooze
+    # survives a full reload but is dropped once its task changes
+    def test_fire_and_snooze(self):
+        second = self.add("second", 0, "00:01")
+        first = self.add("first", 0, "00:00")
+        self.scheduler.start()
+        self.wait_for(2)
+        self.assertEqual(self.fired, ["first", "second"])
+        
+        self.scheduler.snooze(first, "first again", 0.3)
+        self.scheduler.notify()
+        self.wait_for(3)
+        self.assertEqual(self.fired[2], "first again")
+        
+        self.scheduler.snooze(second, "second again", 0.5)
+        self.scheduler.snooze(first, "first once more", 0.7)
+        time.sleep(0.1)
+        self.scheduler.notify(second)
+        self.wait_for(4)
+        self.assertFalse(self.fired_event.wait(0.5))
+        self.assertEqual(self.fired[3:], ["first once more"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import asyncio
+import datetime
+import http.client
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+
+# class for exercising every route and error path of the HTTP/JSON server over localhost
+class TaskServerTest(unittest.TestCase):
+    # function for starting a server on a free port over a fresh database
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.task_server = server.TaskServer(os.path.join(self.directory.name, "tasks.db"), readers=2)
+        self.loop = asyncio.new_event_loop()
+        self.listener = self.loop.run_until_complete(
+            asyncio.start_server(self.task_server.handle_client, "127.0.0.1", 0)
+        )
+        self.port = self.listener.sockets[0].getsockname()[1]
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+    
+    # function for stopping the server and removing the database
+    def tearDown(self):
+        async def close():
+            self.listener.close()
+            await self.listener.wait_closed()
+        
+        asyncio.run_coroutine_threadsafe(close(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close()
+        self.task_server.close()
+        self.directory.cleanup()
+    
+    # function for sending one JSON request, returning the status and decoded body
+    def request(self, method, path, body=None):
+        connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        try:
+            connection.request(method, path, body=None if body is None else json.dumps(body),
+                               headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            connection.close()
+    
+    # function for sending raw bytes, returning the status code of the reply
+    def raw_request(self, data):
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as connection:
+            connection.sendall(data)
+            reply = connection.makefile("rb").readline()
+        return int(reply.split()[1])
+    
+    # function for creating a task through the API
+    def create(self, title, **fields):
+        status, task = self.request("POST", "/tasks", {"title": title, **fields})
+        self.assertEqual(status, 201)
+        return task
+    
+    # function for checking task creation and single-task reads
+    def test_create_and_get(self):
+        task = self.create("write tests", description="for the server", deadline="2030-01-02")
+        self.assertEqual(task["title"], "write tests")
+        self.assertEqual(task["status"], "Pending")
+        
+        self.assertEqual(self.request("GET", f"/tasks/{task['id']}"), (200, task))
+        self.assertEqual(self.request("GET", "/tasks/999")[0], 404)
+    
+    # function for checking that an empty deadline is stored as none on create and update
+    def test_empty_deadline_is_none(self):
+        task = self.create("no deadline", deadline="")
+        self.assertIsNone(task["deadline"])
+        task = self.create("dated", deadline="2030-01-02")
+        self.assertIsNone(self.request("PATCH", f"/tasks/{task['id']}", {"deadline": ""})[1]["deadline"])
+    
+    # function for checking that creation validates its fields
+    def test_create_rejects_bad_fields(self):
+        self.assertEqual(self.request("POST", "/tasks", {"description": "no title"})[0], 400)
+        self.assertEqual(self.request("POST", "/tasks", {"title": "t", "status": "Done"})[0], 400)
+        for deadline in ("tomorrow", "2024-02-30", "2024-1-5", "2024-01-05 10:00"):
+            self.assertEqual(self.request("POST", "/tasks", {"title": "t", "deadline": deadline})[0], 400, deadline)
+    
+    # function for checking keyset paging and the list filters
+    def test_list_pages_and_filters(self):
+        ids = [self.create(f"task {n}", status="Completed" if n % 2 else "Pending")["id"] for n in range(5)]
+        
+        status, page = self.request("GET", "/tasks?limit=2")
+        self.assertEqual((status, [task["id"] for task in page["tasks"]]), (200, ids[:2]))
+        status, page = self.request("GET", f"/tasks?limit=2&after={page['next_after']}")
+        self.assertEqual([task["id"] for task in page["tasks"]], ids[2:4])
+        status, page = self.request("GET", f"/tasks?limit=2&after={page['next_after']}")
+        self.assertEqual(([task["id"] for task in page["tasks"]], page["next_after"]), (ids[4:], None))
+        
+        status, page = self.request("GET", "/tasks?status=Completed")
+        self.assertEqual([task["id"] for task in page["tasks"]], ids[1::2])
+        self.assertEqual(self.request("GET", "/tasks?deadline=someday")[0], 400)
+    
+    # function for checking that a page size below one is rejected instead of crashing or
+    # being read by SQLite as no limit
+    def test_list_rejects_limit_below_one(self):
+        self.create("task")
+        for limit in ("0", "-1", "abc"):
+            status, body = self.request("GET", f"/tasks?limit={limit}")
+            self.assertEqual(status, 400, limit)
+            self.assertIn("error", body)
+    
+    # function for checking the due-today listing
+    def test_due_today(self):
+        today = datetime.date.today().strftime("%Y-%m-%d")
+        due = self.create("due", deadline=today)
+        self.create("done", deadline=today, status="Completed")
+        self.create("later", deadline="2999-01-01")
+        
+        status, body = self.request("GET", "/tasks/due-today")
+        self.assertEqual((status, [task["id"] for task in body["tasks"]]), (200, [due["id"]]))
+    
+    # function for checking partial updates with PATCH and PUT
+    def test_update(self):
+        task = self.create("old title")
+        status, updated = self.request("PATCH", f"/tasks/{task['id']}", {"title": "new title", "reminder": True})
+        self.assertEqual((status, updated["title"], updated["reminder"]), (200, "new title", 1))
+        status, updated = self.request("PUT", f"/tasks/{task['id']}", {"status": "In Progress"})
+        self.assertEqual((status, updated["status"]), (200, "In Progress"))
+        
+        self.assertEqual(self.request("PATCH", f"/tasks/{task['id']}", {})[0], 400)
+        self.assertEqual(self.request("PATCH", f"/tasks/{task['id']}", {"title": " "})[0], 400)
+        self.assertEqual(self.request("PATCH", "/tasks/999", {"title": "x"})[0], 404)
+    
+    # function for checking the bulk status change
+    def test_bulk_status(self):
+        ids = [self.create(f"task {n}")["id"] for n in range(3)]
+        status, body = self.request("POST", "/tasks/bulk-status", {"ids": ids[:2], "status": "Completed"})
+        self.assertEqual((status, body["updated"]), (200, 2))
+        self.assertEqual(self.request("GET", f"/tasks/{ids[2]}")[1]["status"], "Pending")
+        
+        self.assertEqual(self.request("POST", "/tasks/bulk-status", {"ids": "1", "status": "Completed"})[0], 400)
+        self.assertEqual(self.request("POST", "/tasks/bulk-status", {"ids": ids, "status": "Done"})[0], 400)
+    
+    # function for checking deletion
+    def test_delete(self):
+        task = self.create("task")
+        self.assertEqual(self.request("DELETE", f"/tasks/{task['id']}"), (200, {"deleted": task["id"]}))
+        self.assertEqual(self.request("GET", f"/tasks/{task['id']}")[0], 404)
+        self.assertEqual(self.request("DELETE", f"/tasks/{task['id']}")[0], 404)
+    
+    # function for checking unknown routes and methods
+    def test_unknown_route_and_method(self):
+        self.assertEqual(self.request("GET", "/nothing")[0], 404)
+        self.assertEqual(self.request("DELETE", "/tasks")[0], 405)
+    
+    # function for checking malformed requests are answered with a 400 or 413
+    def test_malformed_requests(self):
+        self.assertEqual(self.raw_request(b"GET /tasks HTTP/1.1\r\nContent-Length: abc\r\n\r\n"), 400)
+        self.assertEqual(self.raw_request(b"GET /tasks HTTP/1.1\r\nContent-Length: -5\r\n\r\n"), 400)
+        self.assertEqual(self.raw_request(b"POST /tasks HTTP/1.1\r\nContent-Length: 3\r\n\r\n{x}"), 400)
+        self.assertEqual(self.raw_request(b"NONSENSE\r\n\r\n"), 400)
+        self.assertEqual(
+            self.raw_request(f"POST /tasks HTTP/1.1\r\nContent-Length: {server.MAX_BODY + 1}\r\n\r\n".encode()), 413
+        )
+    
+    # function for checking an unexpected handler error is answered with a 500
+    def test_unexpected_error(self):
+        with mock.patch.object(server, "get_task", side_effect=RuntimeError("boom")), \
+                mock.patch("sys.stderr"):
+            status, body = self.request("GET", "/tasks/1")
+        self.assertEqual((status, body), (500, {"error": "Internal server error"}))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,26 @@
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# class for checking that the startup measurement mode reports and exits on its own
+@unittest.skipUnless(importlib.util.find_spec("tkcalendar"), "tkcalendar is not installed")
+@unittest.skipUnless(sys.platform == "win32" or os.environ.get("DISPLAY"), "no display")
+class MeasureStartupTest(unittest.TestCase):
+    # function for checking that --measure-startup prints the timing and exits 0 or 1
+    def test_measure_startup_exits(self):
+        with tempfile.TemporaryDirectory() as directory:
+            result = subprocess.run(
+                [sys.executable, os.path.join(ROOT, "app.py"), "--measure-startup"],
+                cwd=directory, capture_output=True, text=True, timeout=60
+            )
+        
+        self.assertIn(result.returncode, (0, 1), result.stderr)
+        self.assertIn("Startup:", result.stdout)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import datetime
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import task_io
+import task_store
+
+# SQL counting every counter of task_counts from the tasks table itself, ?1 is today's epoch day
+RECOUNT_SQL = """
+    SELECT COUNT(*),
+        COUNT(*) FILTER (WHERE status IS 'Pending'),
+        COUNT(*) FILTER (WHERE status IS 'In Progress'),
+        COUNT(*) FILTER (WHERE status IS 'Completed'),
+        COUNT(*) FILTER (WHERE reminder IS 1 AND status IS NOT 'Completed'),
+        COUNT(*) FILTER (WHERE status IS NOT 'Completed' AND deadline_day = ?1),
+        COUNT(*) FILTER (WHERE status IS NOT 'Completed' AND deadline_day < ?1)
+    FROM tasks
+"""
+COUNTERS = ("total", "pending", "in_progress", "completed", "reminders", "due_today", "overdue")
+
+# function for creating the single-table database the app wrote before schema versions existed
+def create_version_0(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute('''
+        CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            deadline TEXT,
+            status TEXT DEFAULT 'Pending',
+            reminder INTEGER DEFAULT 0
+        )
+    ''')
+    conn.executemany("INSERT INTO tasks (title, description, deadline, status, reminder) VALUES (?, ?, ?, ?, ?)",
+                     rows)
+    conn.commit()
+    conn.close()
+
+# class for checking schema migrations and the trigger-maintained counters
+class TaskStoreTest(unittest.TestCase):
+    # function for creating a temporary directory for the database
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "tasks.db")
+        self.today = datetime.date.today()
+    
+    # function for removing the database
+    def tearDown(self):
+        self.directory.cleanup()
+    
+    # function for formatting a date a number of days from today
+    def day(self, offset):
+        return (self.today + datetime.timedelta(days=offset)).strftime("%Y-%m-%d")
+    
+    # function for checking that every counter matches a COUNT(*) over the tasks
+    def assertCountsMatch(self, conn, step):
+        counts = task_store.read_counts(conn)
+        expected = conn.execute(RECOUNT_SQL, (task_store.epoch_day(self.today),)).fetchone()
+        self.assertEqual({name: counts[name] for name in COUNTERS}, dict(zip(COUNTERS, expected)), step)
+    
+    # function for checking that a database from before schema versions migrates to the latest one
+    # with its tasks, deadline days, search index and counters filled in
+    def test_migrates_version_0(self):
+        create_version_0(self.path, [
+            ("pay rent", "monthly", self.day(0), "Pending", 1),
+            ("old report", None, self.day(-3), "In Progress", 0),
+            ("no deadline", "", "", "Completed", 0),
+            ("bad deadline", "", "2024-02-30", "Pending", 0),
+        ])
+        
+        conn = task_store.connect(self.path)
+        try:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], len(task_store.MIGRATIONS))
+            rows = conn.execute("SELECT title, deadline, deadline_day FROM tasks ORDER BY id").fetchall()
+            self.assertEqual(rows, [
+                ("pay rent", self.day(0), task_store.epoch_day(self.today)),
+                ("old report", self.day(-3), task_store.epoch_day(self.today) - 3),
+                ("no deadline", None, None),
+                ("bad deadline", "2024-02-30", None),
+            ])
+            self.assertEqual(conn.execute("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'rent'").fetchall(),
+                             [(1,)])
+            self.assertCountsMatch(conn, "after migration")
+            self.assertEqual(task_store.migrate(conn), len(task_store.MIGRATIONS))
+        finally:
+            conn.close()
+    
+    # function for checking that processes opening an old database at the same time each
+    # migrate it without applying a step twice
+    def test_concurrent_migration(self):
+        create_version_0(self.path, [("task", "", None, "Pending", 0)])
+        blocker = sqlite3.connect(self.path, isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")
+        errors = []
+        
+        def open_database():
+            try:
+                task_store.connect(self.path).close()
+            except sqlite3.Error as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=open_database) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        blocker.execute("COMMIT")
+        blocker.close()
+        for thread in threads:
+            thread.join(10)
+        
+        self.assertEqual(errors, [])
+        conn = sqlite3.connect(self.path)
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], len(task_store.MIGRATIONS))
+        conn.close()
+    
+    # function for checking the counters against COUNT(*) after every kind of write
+    def test_counters_match_after_writes(self):
+        conn = task_store.connect(self.path, isolation_level=None)
+        try:
+            conn.execute("BEGIN")
+            task_io.insert_tasks(conn.cursor(), [
+                ("due today", "", self.day(0), "Pending", 1, None),
+                ("overdue", "", self.day(-2), "In Progress", 1, "09:00"),
+                ("later", "", self.day(5), "Pending", 0, None),
+                ("done", "", self.day(-1), "Completed", 1, None),
+                ("undated", "", None, "Pending", 0, None),
+            ])
+            conn.execute("COMMIT")
+            self.assertCountsMatch(conn, "insert")
+            
+            conn.execute("UPDATE tasks SET status = 'Completed' WHERE title = 'overdue'")
+            conn.execute("UPDATE tasks SET deadline = ? WHERE title = 'later'", (self.day(-1),))
+            conn.execute("UPDATE tasks SET reminder = 1 WHERE title = 'undated'")
+            conn.execute("UPDATE tasks SET deadline = 'someday' WHERE title = 'due today'")
+            self.assertCountsMatch(conn, "update")
+            
+            conn.execute("DELETE FROM tasks WHERE title = 'undated'")
+            self.assertCountsMatch(conn, "delete")
+            
+            conn.execute("BEGIN")
+            archived = task_store.archive_completed(conn, self.today + datetime.timedelta(days=1))
+            conn.execute("COMMIT")
+            self.assertEqual(len(archived), 2)
+            self.assertCountsMatch(conn, "archive")
+            
+            conn.execute("BEGIN")
+            task_store.restore_archived(conn, archived)
+            conn.execute("COMMIT")
+            self.assertCountsMatch(conn, "restore")
+        finally:
+            conn.close()
+    
+    # function for checking that the Python deadline_day agrees with the triggers
+    def test_deadline_day_matches_triggers(self):
+        conn = task_store.connect(self.path, isolation_level=None)
+        try:
+            for deadline in (self.day(0), "2024-02-29", "2023-02-29", "2024-02-30", "2024-04-31", "2024-1-5",
+                             "2024-01-05 10:00", "20240105", "2460000", "now", "", None):
+                task_id = conn.execute("INSERT INTO tasks (title, deadline) VALUES ('t', ?)", (deadline,)).lastrowid
+                stored = conn.execute("SELECT deadline_day FROM tasks WHERE id = ?", (task_id,)).fetchone()[0]
+                self.assertEqual(stored, task_store.deadline_day(deadline), deadline)
+        finally:
+            conn.close()
+
+if __name__ == "__main__":
+    unittest.main()